@@ -8,7 +8,27 @@ Provides simulation capabilities and interfaces for quantum-classical hybrid com
 
 from .qpu_interface import QPUInterface
 from .circuit_manager import CircuitManager
+from .calibration import CalibrationManager, CalibrationSnapshot
+from .cost_model import BackendRouter, CostBudgetExceeded, CostModel
+from .sharding import LocalWorkerCluster, ShardCoordinator, ShardError, ShardWorker
+from .pipeline import ClassificationPipeline
+from .prefix_cache import PrefixCachingSimulator, PrefixStateCache
+from .accuracy import PrecisionReport, compare_precision, validate_circuit_family
+from .gradients import adjoint_gradient
+from .shm_transport import SharedResultStore, SharedResultView, attach_result
+from .scheduler import FairShareScheduler, JobState, ScheduledJob
+from .observables import estimate_observable, group_qubit_wise_commuting
+from .trajectory import BatchedTrajectorySimulator
 from .windows_service import WindowsQPUService
 
 __version__ = "0.1.0"
-__all__ = ['QPUInterface', 'CircuitManager', 'WindowsQPUService']
+__all__ = ['QPUInterface', 'CircuitManager', 'WindowsQPUService',
+           'CalibrationManager', 'CalibrationSnapshot',
+           'BackendRouter', 'CostBudgetExceeded', 'CostModel',
+           'LocalWorkerCluster', 'ShardCoordinator', 'ShardError', 'ShardWorker',
+           'ClassificationPipeline', 'PrefixCachingSimulator', 'PrefixStateCache',
+           'PrecisionReport', 'compare_precision', 'validate_circuit_family',
+           'adjoint_gradient', 'SharedResultStore', 'SharedResultView', 'attach_result',
+           'FairShareScheduler', 'JobState', 'ScheduledJob',
+           'estimate_observable', 'group_qubit_wise_commuting',
+           'BatchedTrajectorySimulator']
@@ -0,0 +1,139 @@
+"""
+Accuracy Module
+=============
+
+Harness for checking that reduced simulation precision is safe for a circuit
+family. Exact output distributions are computed at single (complex64) and
+double (complex128) precision and compared by total variation distance.
+"""
+
+import logging
+import cirq
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+PRECISIONS = {
+    'complex64': np.complex64,
+    'complex128': np.complex128,
+}
+
+def precision_dtype(precision: str) -> type:
+    """
+    Map a precision name to its NumPy complex dtype
+
+    Args:
+        precision: 'complex64' or 'complex128'
+
+    Returns:
+        The NumPy dtype
+    """
+    try:
+        return PRECISIONS[precision]
+    except KeyError:
+        raise ValueError(f"Unsupported precision '{precision}', "
+                         f"expected one of {sorted(PRECISIONS)}")
+
+def total_variation_distance(p: np.ndarray, q: np.ndarray) -> float:
+    """Total variation distance between two probability vectors"""
+    return 0.5 * float(np.abs(np.asarray(p, dtype=np.float64) - np.asarray(q, dtype=np.float64)).sum())
+
+def output_distribution(circuit: cirq.Circuit,
+                        precision: str = 'complex128',
+                        noise_model: Optional[cirq.NoiseModel] = None) -> np.ndarray:
+    """
+    Compute the exact distribution over a circuit's measured qubits
+
+    Args:
+        circuit: Circuit with terminal measurements
+        precision: Simulation precision
+        noise_model: Optional noise model (uses density-matrix simulation)
+
+    Returns:
+        Probability of each measured bitstring, big-endian in measurement order
+    """
+    dtype = precision_dtype(precision)
+    measured = [q for op in circuit.all_operations() if cirq.is_measurement(op) for q in op.qubits]
+    unitary = cirq.drop_terminal_measurements(circuit)
+    qubits = sorted(circuit.all_qubits())
+
+    if noise_model is not None:
+        result = cirq.DensityMatrixSimulator(dtype=dtype, noise=noise_model).simulate(
+            unitary, qubit_order=qubits)
+        probabilities = np.real(np.diag(result.final_density_matrix))
+    else:
+        result = cirq.Simulator(dtype=dtype).simulate(unitary, qubit_order=qubits)
+        probabilities = np.abs(result.final_state_vector) ** 2
+
+    # Marginalize onto the measured qubits, in measurement order
+    measured = measured or qubits
+    tensor = probabilities.reshape((2,) * len(qubits))
+    axes = [qubits.index(q) for q in measured]
+    other = tuple(i for i in range(len(qubits)) if i not in axes)
+    marginal = tensor.sum(axis=other) if other else tensor
+    order = sorted(axes)
+    marginal = np.transpose(marginal, [order.index(a) for a in axes])
+    return marginal.reshape(-1).astype(np.float64)
+
+@dataclass
+class PrecisionReport:
+    """Result of comparing single and double precision for one circuit"""
+    name: str
+    num_qubits: int
+    total_variation_distance: float
+    tolerance: float
+
+    @property
+    def passed(self) -> bool:
+        return self.total_variation_distance <= self.tolerance
+
+def compare_precision(circuit: cirq.Circuit,
+                      name: str = 'circuit',
+                      tolerance: float = 1e-4,
+                      noise_model: Optional[cirq.NoiseModel] = None) -> PrecisionReport:
+    """
+    Compare a circuit's output distribution at complex64 against complex128
+
+    Args:
+        circuit: Circuit to check
+        name: Label for the report
+        tolerance: Maximum acceptable total variation distance
+        noise_model: Optional noise model
+
+    Returns:
+        PrecisionReport for the circuit
+    """
+    single = output_distribution(circuit, 'complex64', noise_model)
+    double = output_distribution(circuit, 'complex128', noise_model)
+    report = PrecisionReport(
+        name=name,
+        num_qubits=len(circuit.all_qubits()),
+        total_variation_distance=total_variation_distance(single, double),
+        tolerance=tolerance
+    )
+    logger.info(f"Precision check {name}: TVD={report.total_variation_distance:.2e} "
+                f"({'passed' if report.passed else 'FAILED'})")
+    return report
+
+def validate_circuit_family(circuits: Union[Dict[str, cirq.Circuit], List[cirq.Circuit]],
+                            tolerance: float = 1e-4,
+                            noise_model: Optional[cirq.NoiseModel] = None) -> List[PrecisionReport]:
+    """
+    Check every member of a circuit family for single-precision safety
+
+    Args:
+        circuits: Circuits to check, optionally keyed by name
+        tolerance: Maximum acceptable total variation distance
+        noise_model: Optional noise model
+
+    Returns:
+        One PrecisionReport per circuit
+    """
+    if not isinstance(circuits, dict):
+        circuits = {f"circuit_{i}": c for i, c in enumerate(circuits)}
+    return [
+        compare_precision(circuit, name, tolerance, noise_model)
+        for name, circuit in circuits.items()
+    ]
@@ -0,0 +1,219 @@
+"""
+Calibration Module
+================
+
+Runs QPU calibration in the background and publishes the results as
+immutable, versioned snapshots. Jobs pin the snapshot that was current when
+they started, so a calibration finishing mid-job never changes the values
+that job sees.
+"""
+
+import time
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class CalibrationSnapshot:
+    """Immutable set of calibrated device parameters"""
+    version: int
+    error_rate: float
+    gate_fidelity: float
+    measurement_fidelity: float
+    coherence_time_us: float
+    created_at: float = field(default_factory=time.time)
+
+class CalibrationManager:
+    """Owns the current calibration snapshot and refreshes it in the background"""
+
+    # Values produced by a simulated calibration run
+    SIMULATED_ERROR_RATE = 0.001
+    SIMULATED_GATE_FIDELITY = 0.99
+    SIMULATED_MEASUREMENT_FIDELITY = 0.98
+
+    def __init__(self,
+                 config,
+                 calibration_time_s: float = 1.0,
+                 drift_threshold: float = 0.01,
+                 history_size: int = 16):
+        """
+        Initialize the calibration manager
+
+        Args:
+            config: QPUConfig used to seed the first snapshot
+            calibration_time_s: Simulated duration of one calibration run
+            drift_threshold: Fidelity deviation that triggers recalibration
+            history_size: Number of past snapshots kept for lookup by version
+        """
+        self.config = config
+        self.calibration_time_s = calibration_time_s
+        self.drift_threshold = drift_threshold
+        self.history_size = history_size
+
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="qpu-calibration")
+        self._pending: Optional[Future] = None
+        self._history: Dict[int, CalibrationSnapshot] = {}
+        self._current = CalibrationSnapshot(
+            version=0,
+            error_rate=config.error_rate,
+            gate_fidelity=config.gate_fidelity,
+            measurement_fidelity=config.measurement_fidelity,
+            coherence_time_us=config.coherence_time_us
+        )
+        self._history[0] = self._current
+
+        self._stop_event = threading.Event()
+        self._scheduler: Optional[threading.Thread] = None
+
+    def current(self) -> CalibrationSnapshot:
+        """Return the snapshot new jobs should use"""
+        # Reading a single attribute is atomic; snapshots are never mutated
+        return self._current
+
+    def get(self, version: int) -> Optional[CalibrationSnapshot]:
+        """Return a snapshot by version if it is still in the history"""
+        with self._lock:
+            return self._history.get(version)
+
+    @property
+    def in_progress(self) -> bool:
+        """True while a calibration run is queued or executing"""
+        with self._lock:
+            return self._pending is not None and not self._pending.done()
+
+    def request_calibration(self) -> Future:
+        """
+        Schedule a background calibration run
+
+        Concurrent requests are coalesced into the run already in flight.
+
+        Returns:
+            Future resolving to the new CalibrationSnapshot
+        """
+        with self._lock:
+            if self._pending is not None and not self._pending.done():
+                return self._pending
+            self._pending = self._executor.submit(self._run_calibration)
+            return self._pending
+
+    def _run_calibration(self) -> CalibrationSnapshot:
+        """Measure device parameters and publish them as a new snapshot"""
+        logger.info("Starting background QPU calibration...")
+        try:
+            if self.config.simulation_mode:
+                # Simulate calibration time without holding any lock
+                time.sleep(self.calibration_time_s)
+                measured = dict(
+                    error_rate=self.SIMULATED_ERROR_RATE,
+                    gate_fidelity=self.SIMULATED_GATE_FIDELITY,
+                    measurement_fidelity=self.SIMULATED_MEASUREMENT_FIDELITY
+                )
+            else:
+                # Here we would perform actual hardware calibration
+                raise NotImplementedError("Hardware calibration not implemented")
+
+            with self._lock:
+                snapshot = replace(
+                    self._current,
+                    version=self._current.version + 1,
+                    created_at=time.time(),
+                    **measured
+                )
+                self._history[snapshot.version] = snapshot
+                for old_version in sorted(self._history)[:-self.history_size]:
+                    del self._history[old_version]
+                # Atomic switch-over for jobs started from now on
+                self._current = snapshot
+
+            logger.info(f"Calibration completed successfully (version {snapshot.version})")
+            return snapshot
+
+        except Exception as e:
+            logger.error(f"Calibration failed: {str(e)}")
+            raise
+
+    def report_observation(self,
+                           gate_fidelity: Optional[float] = None,
+                           measurement_fidelity: Optional[float] = None) -> bool:
+        """
+        Compare observed fidelities with the current snapshot
+
+        Args:
+            gate_fidelity: Observed gate fidelity
+            measurement_fidelity: Observed measurement fidelity
+
+        Returns:
+            bool: True if drift was detected and a recalibration was requested
+        """
+        snapshot = self.current()
+        drift = 0.0
+        if gate_fidelity is not None:
+            drift = max(drift, abs(gate_fidelity - snapshot.gate_fidelity))
+        if measurement_fidelity is not None:
+            drift = max(drift, abs(measurement_fidelity - snapshot.measurement_fidelity))
+
+        if drift > self.drift_threshold:
+            logger.info(f"Calibration drift of {drift:.4f} detected, recalibrating")
+            self.request_calibration()
+            return True
+        return False
+
+    def start(self,
+              interval_s: Optional[float] = None,
+              probe: Optional[Callable[[], Dict[str, float]]] = None,
+              probe_interval_s: float = 5.0):
+        """
+        Start periodic and drift-triggered calibration
+
+        Args:
+            interval_s: Recalibrate at this period; None disables the schedule
+            probe: Callable returning observed fidelities for drift detection
+            probe_interval_s: How often the probe is polled
+        """
+        if self._scheduler is not None and self._scheduler.is_alive():
+            return
+
+        self._stop_event.clear()
+        periods = [p for p in (interval_s, probe_interval_s if probe else None) if p]
+        if not periods:
+            return
+        wait_s = min(periods)
+
+        def _loop():
+            last_run = time.monotonic()
+            while not self._stop_event.wait(wait_s):
+                try:
+                    if probe is not None and self.report_observation(**probe()):
+                        last_run = time.monotonic()
+                        continue
+                    if interval_s is not None and time.monotonic() - last_run >= interval_s:
+                        self.request_calibration()
+                        last_run = time.monotonic()
+                except Exception as e:
+                    logger.error(f"Calibration scheduler error: {str(e)}")
+
+        self._scheduler = threading.Thread(target=_loop, name="qpu-calibration-scheduler", daemon=True)
+        self._scheduler.start()
+        logger.info("Calibration scheduler started")
+
+    def stop(self):
+        """Stop the scheduler and wait for any running calibration"""
+        self._stop_event.set()
+        if self._scheduler is not None:
+            self._scheduler.join()
+            self._scheduler = None
+        with self._lock:
+            pending = self._pending
+        if pending is not None:
+            pending.exception()
+
+    def close(self):
+        """Stop the scheduler and shut down the calibration worker thread"""
+        self.stop()
+        self._executor.shutdown(wait=True)
+        logger.info("Calibration manager closed")
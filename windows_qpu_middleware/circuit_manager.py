@@ -7,35 +7,47 @@ Provides high-level interfaces for common quantum operations.
 """
 
 import cirq
+import sympy
 import numpy as np
 from typing import Dict, List, Optional, Union, Tuple
 import logging
 from .qpu_interface import QPUInterface, QPUConfig
+from .sharding import ShardCoordinator
+from .observables import estimate_observable
 
 logger = logging.getLogger(__name__)
 
 class CircuitManager:
     """Manages quantum circuits for different applications"""
     
-    def __init__(self, qpu_interface: Optional[QPUInterface] = None):
+    def __init__(self,
+                 qpu_interface: Optional[QPUInterface] = None,
+                 coordinator: Optional[ShardCoordinator] = None):
         """
         Initialize the circuit manager
         
         Args:
             qpu_interface: QPU interface instance. If None, creates a new one.
+            coordinator: Optional shard coordinator; when set, executions are
+                split across its workers instead of running locally
         """
         self.qpu = qpu_interface or QPUInterface()
+        self.coordinator = coordinator
         logger.info("Initialized Circuit Manager")
     
     def create_pattern_recognition_circuit(self, 
-                                         input_data: List[float],
-                                         num_layers: int = 2) -> cirq.Circuit:
+                                         input_data: List[Union[float, str]],
+                                         num_layers: int = 2,
+                                         weights: Optional[List[Union[float, str]]] = None) -> cirq.Circuit:
         """
         Create a quantum circuit for pattern recognition tasks
         
         Args:
-            input_data: Classical data to encode into quantum state
+            input_data: Classical data to encode into quantum state; strings
+                become sympy symbols of that name
             num_layers: Number of quantum layers for pattern recognition
+            weights: Trainable rotations, num_layers values per qubit in layer
+                order (default 0.5 each); strings become sympy symbols
             
         Returns:
             cirq.Circuit: Quantum circuit for pattern recognition
@@ -43,6 +55,10 @@ class CircuitManager:
         try:
             operations = []
             qubits = list(range(min(len(input_data), self.qpu.config.num_qubits)))
+            if weights is None:
+                weights = [0.5] * (num_layers * len(qubits))
+            if len(weights) != num_layers * len(qubits):
+                raise ValueError(f"Expected {num_layers * len(qubits)} weights, got {len(weights)}")
             
             # Initial layer - data encoding
             for i, data in enumerate(input_data):
@@ -54,6 +70,8 @@ class CircuitManager:
                     'gate': 'H',
                     'qubits': [i]
                 })
+                if isinstance(data, str):
+                    data = sympy.Symbol(data)
                 operations.append({
                     'gate': 'Y',
                     'qubits': [i],
@@ -61,7 +79,7 @@ class CircuitManager:
                 })
             
             # Pattern recognition layers
-            for _ in range(num_layers):
+            for layer in range(num_layers):
                 # Add entangling layers
                 for i in range(len(qubits) - 1):
                     operations.append({
@@ -74,7 +92,7 @@ class CircuitManager:
                     operations.append({
                         'gate': 'Y',
                         'qubits': [i],
-                        'params': 0.5
+                        'params': weights[layer * len(qubits) + i]
                     })
             
             # Measurement
@@ -91,13 +109,14 @@ class CircuitManager:
             raise
     
     def create_optimization_circuit(self,
-                                  parameters: List[float],
+                                  parameters: List[Union[float, str]],
                                   num_iterations: int = 3) -> cirq.Circuit:
         """
         Create a quantum circuit for optimization tasks
         
         Args:
-            parameters: Parameters for the optimization problem
+            parameters: Parameters for the optimization problem; strings
+                become sympy symbols of that name
             num_iterations: Number of optimization iterations
             
         Returns:
@@ -146,6 +165,93 @@ class CircuitManager:
             logger.error(f"Error creating optimization circuit: {str(e)}")
             raise
     
+    def estimate_expectation(self,
+                             circuit: cirq.Circuit,
+                             observable: Union[cirq.PauliSum, Dict[str, float]],
+                             shots: int = 1000) -> Dict:
+        """
+        Estimate the expectation value of a weighted sum of Pauli strings
+        
+        Terms are grouped into qubit-wise commuting sets so each set needs
+        only one execution.
+        
+        Args:
+            circuit: State preparation circuit
+            observable: PauliSum, or weighted Pauli strings for create_observable
+            shots: Number of repetitions per commuting group
+            
+        Returns:
+            Dict with 'expectation', per-term 'terms' estimates and 'groups' count
+        """
+        try:
+            if isinstance(observable, dict):
+                observable = self.qpu.create_observable(observable)
+            return estimate_observable(self.qpu, circuit, observable, shots)
+            
+        except Exception as e:
+            logger.error(f"Error estimating expectation value: {str(e)}")
+            raise
+    
+    def optimization_gradient(self,
+                              parameters: List[float],
+                              observable: Union[cirq.PauliSum, Dict[str, float]],
+                              num_iterations: int = 3) -> Dict:
+        """
+        Gradient of an optimization cost with respect to its parameters
+        
+        Args:
+            parameters: Current parameter values
+            observable: Cost observable (PauliSum or weighted Pauli strings)
+            num_iterations: Number of optimization iterations in the circuit
+            
+        Returns:
+            Dict with 'expectation' and 'gradients' aligned with parameters
+        """
+        try:
+            names = [f"p{i}" for i in range(len(parameters))]
+            circuit = self.create_optimization_circuit(names, num_iterations)
+            result = self.qpu.gradient(circuit, observable, dict(zip(names, parameters)))
+            
+            return {
+                'expectation': result['expectation'],
+                'gradients': [result['gradients'].get(name, 0.0) for name in names]
+            }
+            
+        except Exception as e:
+            logger.error(f"Error computing optimization gradient: {str(e)}")
+            raise
+    
+    def pattern_recognition_gradient(self,
+                                     input_data: List[float],
+                                     weights: List[float],
+                                     observable: Union[cirq.PauliSum, Dict[str, float]],
+                                     num_layers: int = 2) -> Dict:
+        """
+        Gradient of a pattern recognition cost with respect to its weights
+        
+        Args:
+            input_data: Data encoded by the circuit
+            weights: Current rotation weights (see create_pattern_recognition_circuit)
+            observable: Cost observable (PauliSum or weighted Pauli strings)
+            num_layers: Number of pattern recognition layers
+            
+        Returns:
+            Dict with 'expectation' and 'gradients' aligned with weights
+        """
+        try:
+            names = [f"w{i}" for i in range(len(weights))]
+            circuit = self.create_pattern_recognition_circuit(input_data, num_layers, names)
+            result = self.qpu.gradient(circuit, observable, dict(zip(names, weights)))
+            
+            return {
+                'expectation': result['expectation'],
+                'gradients': [result['gradients'].get(name, 0.0) for name in names]
+            }
+            
+        except Exception as e:
+            logger.error(f"Error computing pattern recognition gradient: {str(e)}")
+            raise
+    
     def execute_with_error_mitigation(self,
                                     circuit: cirq.Circuit,
                                     shots: int = 1000) -> Dict:
@@ -161,7 +267,10 @@ class CircuitManager:
         """
         try:
             # Execute circuit
-            raw_results = self.qpu.execute_circuit(circuit, shots=shots)
+            if self.coordinator is not None:
+                raw_results = self.coordinator.run_shots(circuit, shots)
+            else:
+                raw_results = self.qpu.execute_circuit(circuit, shots=shots)
             
             # Apply error mitigation
             mitigated_results = self.qpu.apply_error_mitigation(raw_results)
@@ -175,6 +284,37 @@ class CircuitManager:
             logger.error(f"Error in circuit execution with mitigation: {str(e)}")
             raise
     
+    def run_parameter_sweep(self,
+                            circuit: cirq.Circuit,
+                            resolvers: List[Dict[str, float]],
+                            shots: int = 1000) -> List[Dict]:
+        """
+        Execute a parameterized circuit at each point of a sweep
+        
+        Args:
+            circuit: Circuit containing sympy symbols
+            resolvers: Parameter values for each sweep point
+            shots: Number of repetitions per sweep point
+            
+        Returns:
+            List of execution results in sweep order
+        """
+        try:
+            if self.coordinator is not None:
+                return self.coordinator.run_sweep(circuit, resolvers, shots)
+            
+            return [
+                self.qpu.execute_circuit(
+                    cirq.resolve_parameters(circuit, cirq.ParamResolver(resolver)),
+                    shots=shots
+                )
+                for resolver in resolvers
+            ]
+            
+        except Exception as e:
+            logger.error(f"Error in parameter sweep: {str(e)}")
+            raise
+    
     def run_pattern_recognition(self,
                               input_data: List[float],
                               shots: int = 1000) -> Dict:
@@ -194,14 +334,7 @@ class CircuitManager:
             results = self.execute_with_error_mitigation(circuit, shots)
             
             # Process results
-            mitigated_counts = results['mitigated_results']['counts']
-            
-            # Calculate pattern confidence
-            total_counts = sum(sum(counts.values()) for counts in mitigated_counts.values())
-            pattern_confidence = max(
-                sum(counts.values()) / total_counts 
-                for counts in mitigated_counts.values()
-            )
+            pattern_confidence = self._pattern_confidence(results['mitigated_results']['counts'])
             
             return {
                 'pattern_detected': pattern_confidence > 0.6,
@@ -213,6 +346,48 @@ class CircuitManager:
             logger.error(f"Error in pattern recognition: {str(e)}")
             raise
     
+    def run_pattern_recognition_batch(self,
+                                      rows: List[List[float]],
+                                      shots: int = 1000) -> List[Dict]:
+        """
+        Run pattern recognition on many inputs as one batch
+        
+        Unlike run_pattern_recognition, only the compact outcome is kept for
+        each row so memory stays proportional to the batch size.
+        
+        Args:
+            rows: Input vectors to analyze
+            shots: Number of circuit repetitions per row
+            
+        Returns:
+            List of dicts with 'pattern_detected' and 'confidence' per row
+        """
+        try:
+            circuits = [self.create_pattern_recognition_circuit(row) for row in rows]
+            
+            outcomes = []
+            for raw_results in self.qpu.execute_batch(circuits, shots=shots):
+                mitigated = self.qpu.apply_error_mitigation(raw_results)
+                confidence = self._pattern_confidence(mitigated['counts'])
+                outcomes.append({
+                    'pattern_detected': confidence > 0.6,
+                    'confidence': confidence
+                })
+            return outcomes
+            
+        except Exception as e:
+            logger.error(f"Error in batch pattern recognition: {str(e)}")
+            raise
+    
+    @staticmethod
+    def _pattern_confidence(mitigated_counts: Dict) -> float:
+        """Calculate pattern confidence from mitigated counts"""
+        total_counts = sum(sum(counts.values()) for counts in mitigated_counts.values())
+        return max(
+            sum(counts.values()) / total_counts 
+            for counts in mitigated_counts.values()
+        )
+    
     def run_optimization(self,
                         parameters: List[float],
                         shots: int = 1000) -> Dict:
@@ -0,0 +1,356 @@
+"""
+Cost Model Module
+===============
+
+Predicts the memory and runtime of a circuit execution for each available
+simulation strategy, and routes jobs to the cheapest strategy that fits the
+configured resource budget. Jobs that cannot fit are rejected (or have their
+shot count reduced) before any statevector is allocated.
+"""
+
+import time
+import logging
+import cirq
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from .trajectory import trajectory_batch_size
+
+logger = logging.getLogger(__name__)
+
+class CostBudgetExceeded(ValueError):
+    """Raised when a job cannot be executed within the resource budget"""
+
+@dataclass(frozen=True)
+class CircuitProfile:
+    """Structural features of a job that drive its cost"""
+    num_qubits: int
+    depth: int
+    single_qubit_gates: int
+    multi_qubit_gates: int
+    measured_qubits: int
+    shots: int
+    noisy: bool
+    clifford: bool
+
+    @property
+    def gate_count(self) -> int:
+        """Gate count weighted by arity"""
+        return self.single_qubit_gates + 2 * self.multi_qubit_gates
+
+@dataclass(frozen=True)
+class CostEstimate:
+    """Predicted cost of running a job with one strategy"""
+    strategy: str
+    memory_bytes: int
+    runtime_s: float
+    shots: int
+
+class CostModel:
+    """Linear runtime and analytic memory model for each simulation strategy"""
+
+    STATEVECTOR = 'statevector'
+    DENSITY_MATRIX = 'density_matrix'
+    CLIFFORD = 'clifford'
+    TRAJECTORY = 'trajectory'
+
+    # Seconds per unit of gate work and per unit of sampling work, plus a
+    # fixed overhead. Defaults are rough figures for a desktop CPU; call
+    # fit() with benchmark data to calibrate them for the host.
+    DEFAULT_COEFFICIENTS: Dict[str, Tuple[float, float, float]] = {
+        STATEVECTOR: (2e-9, 5e-8, 1e-3),
+        DENSITY_MATRIX: (2e-9, 5e-8, 1e-3),
+        CLIFFORD: (2e-7, 1e-7, 1e-3),
+        TRAJECTORY: (1e-9, 5e-8, 1e-3),
+    }
+
+    # Strategies the router considers unless told otherwise. Trajectory runs
+    # draw their noise from the calibration rather than a noise model, so
+    # they are only used when requested explicitly.
+    DEFAULT_STRATEGIES: Tuple[str, ...] = (STATEVECTOR, DENSITY_MATRIX, CLIFFORD)
+
+    def __init__(self,
+                 coefficients: Optional[Dict[str, Tuple[float, float, float]]] = None,
+                 itemsize: int = 8):
+        """
+        Initialize the cost model
+
+        Args:
+            coefficients: Per-strategy (gate, shot, overhead) runtime coefficients
+            itemsize: Bytes per complex amplitude used by the simulators
+        """
+        self.coefficients = dict(self.DEFAULT_COEFFICIENTS)
+        if coefficients:
+            self.coefficients.update(coefficients)
+        self.itemsize = itemsize
+
+    @staticmethod
+    def profile(circuit: cirq.Circuit, shots: int, noisy: bool = False) -> CircuitProfile:
+        """
+        Extract the cost-relevant features of a circuit
+
+        Args:
+            circuit: Circuit to profile
+            shots: Number of repetitions
+            noisy: Whether the job runs with a noise model
+
+        Returns:
+            CircuitProfile describing the job
+        """
+        single = multi = measured = 0
+        clifford = True
+        for op in circuit.all_operations():
+            if cirq.is_measurement(op):
+                measured += len(op.qubits)
+                continue
+            if len(op.qubits) > 1:
+                multi += 1
+            else:
+                single += 1
+            if clifford and not cirq.has_stabilizer_effect(op):
+                clifford = False
+
+        return CircuitProfile(
+            num_qubits=len(circuit.all_qubits()),
+            depth=len(circuit),
+            single_qubit_gates=single,
+            multi_qubit_gates=multi,
+            measured_qubits=measured,
+            shots=shots,
+            noisy=noisy,
+            clifford=clifford
+        )
+
+    def supports(self, strategy: str, profile: CircuitProfile) -> bool:
+        """Check whether a strategy can simulate the profiled job at all"""
+        if strategy == self.CLIFFORD:
+            return profile.clifford and not profile.noisy
+        if strategy == self.TRAJECTORY:
+            return profile.noisy
+        return strategy in self.coefficients
+
+    def _work(self, strategy: str, profile: CircuitProfile, shots: int) -> Tuple[float, float]:
+        """Return (gate work, sampling work) for a strategy"""
+        n = profile.num_qubits
+        sampling = float(shots * max(profile.measured_qubits, 1))
+
+        if strategy == self.STATEVECTOR:
+            gate_work = float(profile.gate_count) * 2.0 ** n
+            if profile.noisy:
+                # Noisy runs re-simulate one trajectory per repetition
+                gate_work *= shots
+            return gate_work, sampling
+        if strategy == self.DENSITY_MATRIX:
+            # Noise channels roughly double the operation count
+            ops = profile.gate_count * (2 if profile.noisy else 1)
+            return float(ops) * 4.0 ** n, sampling
+        if strategy == self.CLIFFORD:
+            return float(profile.gate_count) * n * shots, sampling
+        if strategy == self.TRAJECTORY:
+            # Worst case: every trajectory diverges from the error-free path
+            return float(profile.gate_count) * 2.0 ** n * shots, sampling
+        raise ValueError(f"Unknown simulation strategy: {strategy}")
+
+    def memory_bytes(self, strategy: str, profile: CircuitProfile, shots: int) -> int:
+        """Predict peak memory for a strategy"""
+        n = profile.num_qubits
+        # Measurement records are stored as one byte per measured qubit per shot
+        records = shots * profile.measured_qubits
+        if strategy == self.STATEVECTOR:
+            # State plus an equally sized scratch buffer
+            return 2 * (2 ** n) * self.itemsize + records
+        if strategy == self.DENSITY_MATRIX:
+            return 2 * (4 ** n) * self.itemsize + records
+        if strategy == self.CLIFFORD:
+            return 4 * n * n + records
+        if strategy == self.TRAJECTORY:
+            batch = min(max(shots, 1), trajectory_batch_size(n, self.itemsize))
+            return 2 * batch * (2 ** n) * self.itemsize + records
+        raise ValueError(f"Unknown simulation strategy: {strategy}")
+
+    def estimate(self, strategy: str, profile: CircuitProfile,
+                 shots: Optional[int] = None) -> CostEstimate:
+        """
+        Predict memory and runtime of a job for one strategy
+
+        Args:
+            strategy: Simulation strategy name
+            profile: Job profile
+            shots: Shot count override (defaults to profile.shots)
+
+        Returns:
+            CostEstimate for the strategy
+        """
+        shots = profile.shots if shots is None else shots
+        gate_c, shot_c, overhead = self.coefficients[strategy]
+        gate_work, sampling = self._work(strategy, profile, shots)
+        return CostEstimate(
+            strategy=strategy,
+            memory_bytes=self.memory_bytes(strategy, profile, shots),
+            runtime_s=gate_c * gate_work + shot_c * sampling + overhead,
+            shots=shots
+        )
+
+    def fit(self, samples: List[Tuple[str, CircuitProfile, float]]) -> Dict[str, Tuple[float, float, float]]:
+        """
+        Calibrate runtime coefficients against measured benchmark runs
+
+        Args:
+            samples: (strategy, profile, measured seconds) tuples
+
+        Returns:
+            The updated coefficient table
+        """
+        by_strategy: Dict[str, List[Tuple[CircuitProfile, float]]] = {}
+        for strategy, profile, seconds in samples:
+            by_strategy.setdefault(strategy, []).append((profile, seconds))
+
+        for strategy, rows in by_strategy.items():
+            if len(rows) < 3:
+                logger.warning(f"Not enough benchmark samples to fit {strategy}")
+                continue
+            design = np.array([
+                [*self._work(strategy, profile, profile.shots), 1.0]
+                for profile, _ in rows
+            ])
+            measured = np.array([seconds for _, seconds in rows])
+            # Scale columns so the solve is well conditioned
+            scale = np.maximum(np.abs(design).max(axis=0), 1e-12)
+            solution, *_ = np.linalg.lstsq(design / scale, measured, rcond=None)
+            # Negative coefficients are fitting noise, not a speed-up
+            self.coefficients[strategy] = tuple(float(c) for c in np.maximum(solution / scale, 0.0))
+            logger.info(f"Calibrated cost model for {strategy}: {self.coefficients[strategy]}")
+
+        return self.coefficients
+
+    def benchmark(self,
+                  simulators: Dict[str, cirq.SimulatesSamples],
+                  qubit_counts: Tuple[int, ...] = (2, 4, 6, 8, 10),
+                  depth: int = 10,
+                  shots: int = 200,
+                  seed: Optional[int] = None) -> List[Tuple[str, CircuitProfile, float]]:
+        """
+        Time random circuits on each simulator to produce data for fit()
+
+        Args:
+            simulators: Simulator instance per strategy name
+            qubit_counts: Circuit widths to benchmark
+            depth: Number of gate layers per benchmark circuit
+            shots: Repetitions per benchmark run
+            seed: Seed for the random circuit generator
+
+        Returns:
+            List of (strategy, profile, measured seconds) samples
+        """
+        rng = np.random.default_rng(seed)
+        samples = []
+        for n in qubit_counts:
+            qubits = cirq.LineQubit.range(n)
+            for strategy, simulator in simulators.items():
+                circuit = cirq.Circuit()
+                for _ in range(depth):
+                    for q in qubits:
+                        if strategy == self.CLIFFORD:
+                            circuit.append(cirq.H(q) if rng.random() < 0.5 else cirq.S(q))
+                        else:
+                            circuit.append(cirq.X(q) ** float(rng.random()))
+                    for a, b in zip(qubits[::2], qubits[1::2]):
+                        circuit.append(cirq.CNOT(a, b))
+                circuit.append(cirq.measure(*qubits, key='m'))
+
+                profile = self.profile(circuit, shots)
+                start = time.perf_counter()
+                simulator.run(circuit, repetitions=shots)
+                samples.append((strategy, profile, time.perf_counter() - start))
+        return samples
+
+class BackendRouter:
+    """Chooses the cheapest feasible simulation strategy for each job"""
+
+    def __init__(self, config, cost_model: Optional[CostModel] = None):
+        """
+        Initialize the router
+
+        Args:
+            config: QPUConfig holding the resource budget
+            cost_model: Cost model to use. If None, creates a default one.
+        """
+        self.config = config
+        self.cost_model = cost_model or CostModel()
+
+    def plan(self,
+             circuit: cirq.Circuit,
+             shots: int,
+             noisy: bool = False,
+             strategies: Optional[List[str]] = None) -> CostEstimate:
+        """
+        Pick a strategy for a job, enforcing the resource budget
+
+        Args:
+            circuit: Circuit to execute
+            shots: Requested number of repetitions
+            noisy: Whether the job runs with a noise model
+            strategies: Candidate strategies (defaults to DEFAULT_STRATEGIES)
+
+        Returns:
+            CostEstimate of the chosen strategy; its shot count may be lower
+            than requested when downscaling is allowed
+
+        Raises:
+            CostBudgetExceeded: If no strategy fits the budget
+        """
+        if len(circuit) > self.config.max_circuit_depth:
+            raise CostBudgetExceeded(
+                f"Circuit depth {len(circuit)} exceeds max_circuit_depth "
+                f"{self.config.max_circuit_depth}"
+            )
+
+        profile = self.cost_model.profile(circuit, shots, noisy)
+        memory_budget = self.config.max_memory_mb * 2 ** 20
+        runtime_budget = self.config.max_runtime_s
+
+        candidates = [
+            self.cost_model.estimate(s, profile)
+            for s in (strategies or self.cost_model.DEFAULT_STRATEGIES)
+            if self.cost_model.supports(s, profile)
+        ]
+        fitting = [e for e in candidates if e.memory_bytes <= memory_budget]
+        if not fitting:
+            smallest = min(candidates, key=lambda e: e.memory_bytes)
+            raise CostBudgetExceeded(
+                f"Job needs at least {smallest.memory_bytes / 2 ** 20:.1f} MB "
+                f"({profile.num_qubits} qubits, {smallest.strategy}), "
+                f"budget is {self.config.max_memory_mb:.1f} MB"
+            )
+
+        best = min(fitting, key=lambda e: e.runtime_s)
+        if runtime_budget is None or best.runtime_s <= runtime_budget:
+            logger.info(f"Routing job to {best.strategy} "
+                        f"(~{best.runtime_s:.3f}s, {best.memory_bytes / 2 ** 20:.1f} MB)")
+            return best
+
+        if self.config.allow_downscale:
+            downscaled = [self._downscale(e, profile, runtime_budget) for e in fitting]
+            downscaled = [e for e in downscaled if e is not None]
+            if downscaled:
+                best = max(downscaled, key=lambda e: (e.shots, -e.runtime_s))
+                logger.warning(f"Downscaling job from {shots} to {best.shots} shots "
+                               f"to fit the {runtime_budget:.3f}s budget")
+                return best
+
+        raise CostBudgetExceeded(
+            f"Job needs ~{best.runtime_s:.3f}s ({best.strategy}), "
+            f"budget is {runtime_budget:.3f}s"
+        )
+
+    def _downscale(self, estimate: CostEstimate, profile: CircuitProfile,
+                   runtime_budget: float) -> Optional[CostEstimate]:
+        """Find the largest shot count that fits the runtime budget"""
+        low, high = 0, estimate.shots
+        while low < high:
+            mid = (low + high + 1) // 2
+            if self.cost_model.estimate(estimate.strategy, profile, mid).runtime_s <= runtime_budget:
+                low = mid
+            else:
+                high = mid - 1
+        return self.cost_model.estimate(estimate.strategy, profile, low) if low > 0 else None
@@ -0,0 +1,105 @@
+"""
+Gradients Module
+==============
+
+Exact gradients of expectation values for parameterized circuits using
+adjoint differentiation. One forward pass produces the final state; a single
+backward pass then un-applies each gate to both the state and the
+observable-weighted co-state, accumulating every parameter's derivative
+along the way. Cost is independent of the number of parameters.
+"""
+
+import logging
+import cirq
+import sympy
+import numpy as np
+from typing import Dict, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+def _apply(state: np.ndarray, matrix: np.ndarray, axes: List[int]) -> np.ndarray:
+    """Apply a k-qubit matrix to the given axes of a state tensor"""
+    k = len(axes)
+    return cirq.targeted_left_multiply(
+        matrix.reshape((2,) * (2 * k)).astype(state.dtype, copy=False), state, axes
+    )
+
+def _apply_observable(observable: cirq.PauliSum,
+                      state: np.ndarray,
+                      index: Dict[cirq.Qid, int]) -> np.ndarray:
+    """Return observable |state> for a sum of Pauli strings"""
+    result = np.zeros_like(state)
+    for term in observable:
+        branch = state
+        for qubit, pauli in term.items():
+            branch = _apply(branch, cirq.unitary(pauli), [index[qubit]])
+        result += term.coefficient * branch
+    return result
+
+def _generator(gate: cirq.EigenGate) -> np.ndarray:
+    """
+    Hermitian G with dU/dt = i G U for an EigenGate raised to exponent t
+
+    EigenGate unitaries are sum_k exp(i pi t (lambda_k + shift)) P_k, so the
+    generator is pi * sum_k (lambda_k + shift) P_k.
+    """
+    components = gate._eigen_components()
+    return np.pi * sum((half_turns + gate.global_shift) * projector
+                       for half_turns, projector in components)
+
+def adjoint_gradient(circuit: cirq.Circuit,
+                     observable: cirq.PauliSum,
+                     qubits: Sequence[cirq.Qid],
+                     param_resolver: cirq.ParamResolverOrSimilarType = None,
+                     dtype: type = np.complex128) -> Tuple[float, Dict[str, float]]:
+    """
+    Compute <observable> and its gradient with respect to every circuit symbol
+
+    Args:
+        circuit: Circuit whose gate exponents may contain sympy symbols;
+            terminal measurements are ignored
+        observable: Hermitian sum of Pauli strings
+        qubits: Qubit order of the state
+        param_resolver: Values for the circuit's symbols
+        dtype: Complex dtype of the simulated state
+
+    Returns:
+        (expectation value, {symbol name: derivative})
+    """
+    if not circuit.are_all_measurements_terminal():
+        raise ValueError("Adjoint gradients require all measurements to be terminal")
+
+    resolver = cirq.ParamResolver(param_resolver)
+    index = {q: i for i, q in enumerate(qubits)}
+    ops = [op for op in circuit.all_operations() if not cirq.is_measurement(op)]
+    resolved = [cirq.resolve_parameters(op, resolver) for op in ops]
+    unitaries = [cirq.unitary(op) for op in resolved]
+
+    # Forward pass
+    state = np.zeros((2,) * len(qubits), dtype=dtype)
+    state[(0,) * len(qubits)] = 1
+    for op, unitary in zip(ops, unitaries):
+        state = _apply(state, unitary, [index[q] for q in op.qubits])
+
+    co_state = _apply_observable(observable, state, index)
+    expectation = float(np.real(np.vdot(state, co_state)))
+
+    # Backward pass
+    gradients = {symbol.name: 0.0 for symbol in cirq.parameter_symbols(circuit)}
+    for op, resolved_op, unitary in zip(reversed(ops), reversed(resolved), reversed(unitaries)):
+        axes = [index[q] for q in op.qubits]
+        if cirq.is_parameterized(op):
+            if not isinstance(op.gate, cirq.EigenGate):
+                raise ValueError(f"Cannot differentiate non-EigenGate operation {op}")
+            # dE/dt = 2 Re <co_state| i G |state> for this gate's exponent t
+            derivative = _apply(state, 1j * _generator(resolved_op.gate), axes)
+            d_exponent = 2.0 * float(np.real(np.vdot(co_state, derivative)))
+            for symbol in cirq.parameter_symbols(op):
+                chain = resolver.value_of(sympy.diff(op.gate.exponent, symbol))
+                gradients[symbol.name] += d_exponent * float(chain)
+
+        inverse = unitary.conj().T
+        state = _apply(state, inverse, axes)
+        co_state = _apply(co_state, inverse, axes)
+
+    return expectation, gradients
@@ -0,0 +1,111 @@
+"""
+Observables Module
+================
+
+Estimates expectation values of weighted Pauli sums from samples. Terms are
+partitioned into qubit-wise commuting groups; each group needs a single
+circuit execution with basis-change rotations appended before a joint
+measurement, and every term in the group is rebuilt from those shared
+samples.
+"""
+
+import logging
+import cirq
+import numpy as np
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+MEASUREMENT_KEY = 'pauli_basis'
+
+# Rotations that map each Pauli eigenbasis onto the computational basis
+_BASIS_CHANGE = {
+    cirq.X: lambda q: [cirq.H(q)],
+    cirq.Y: lambda q: [cirq.S(q) ** -1, cirq.H(q)],
+    cirq.Z: lambda q: [],
+}
+
+def group_qubit_wise_commuting(observable: cirq.PauliSum) -> List[Tuple[Dict[cirq.Qid, cirq.Pauli], List[cirq.PauliString]]]:
+    """
+    Partition the terms of a Pauli sum into qubit-wise commuting groups
+
+    Terms are placed greedily, largest support first, into the first group
+    whose measurement basis they agree with on every shared qubit.
+
+    Args:
+        observable: Weighted sum of Pauli strings
+
+    Returns:
+        List of (measurement basis, terms) pairs
+    """
+    groups: List[Tuple[Dict[cirq.Qid, cirq.Pauli], List[cirq.PauliString]]] = []
+    terms = sorted((term for term in observable if len(term) > 0), key=len, reverse=True)
+    for term in terms:
+        for basis, members in groups:
+            if all(basis.get(q, pauli) == pauli for q, pauli in term.items()):
+                basis.update(term.items())
+                members.append(term)
+                break
+        else:
+            groups.append((dict(term.items()), [term]))
+    return groups
+
+def measurement_circuit(circuit: cirq.Circuit, basis: Dict[cirq.Qid, cirq.Pauli]) -> cirq.Circuit:
+    """
+    Append basis-change rotations and a joint measurement to a circuit
+
+    Args:
+        circuit: State preparation circuit; terminal measurements are dropped
+        basis: Pauli to measure on each qubit
+
+    Returns:
+        Circuit measuring the basis qubits (sorted) under MEASUREMENT_KEY
+    """
+    qubits = sorted(basis)
+    measured = cirq.drop_terminal_measurements(circuit)
+    measured.append(
+        [op for q in qubits for op in _BASIS_CHANGE[basis[q]](q)],
+        strategy=cirq.InsertStrategy.NEW_THEN_INLINE
+    )
+    measured.append(cirq.measure(*qubits, key=MEASUREMENT_KEY))
+    return measured
+
+def estimate_observable(qpu,
+                        circuit: cirq.Circuit,
+                        observable: cirq.PauliSum,
+                        shots: int = 1000) -> Dict:
+    """
+    Estimate <observable> with one batched execution per commuting group
+
+    Args:
+        qpu: QPUInterface used to execute the measurement circuits
+        circuit: State preparation circuit
+        observable: Weighted sum of Pauli strings
+        shots: Repetitions per group
+
+    Returns:
+        Dict with 'expectation', per-term 'terms' estimates and 'groups' count
+    """
+    groups = group_qubit_wise_commuting(observable)
+    identity = sum(float(np.real(term.coefficient)) for term in observable if len(term) == 0)
+
+    circuits = [measurement_circuit(circuit, basis) for basis, _ in groups]
+    results = qpu.execute_batch(circuits, shots=shots) if circuits else []
+
+    expectation = identity
+    terms: Dict[str, float] = {}
+    for (basis, members), result in zip(groups, results):
+        columns = {q: i for i, q in enumerate(sorted(basis))}
+        bits = np.asarray(result['measurements'][MEASUREMENT_KEY], dtype=np.int8)
+        for term in members:
+            parity = np.bitwise_xor.reduce(bits[:, [columns[q] for q in term.qubits]], axis=1)
+            value = float(np.mean(1 - 2 * parity))
+            terms[str(term.with_coefficient(1))] = value
+            expectation += float(np.real(term.coefficient)) * value
+
+    logger.info(f"Estimated {len(observable)} Pauli terms with {len(groups)} grouped executions")
+    return {
+        'expectation': expectation,
+        'terms': terms,
+        'groups': len(groups)
+    }
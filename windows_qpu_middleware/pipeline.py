@@ -0,0 +1,170 @@
+"""
+Pipeline Module
+=============
+
+Streams large datasets through pattern recognition in fixed-size chunks.
+Inputs are read incrementally (CSV) or memory-mapped (NPY), each chunk is
+executed as one batch, compact results are appended to an output CSV, and
+progress is checkpointed so an interrupted run resumes where it stopped.
+"""
+
+import os
+import csv
+import json
+import logging
+import numpy as np
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from .circuit_manager import CircuitManager
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[str, Path]
+
+class ClassificationPipeline:
+    """Chunked, resumable pattern recognition over a dataset"""
+
+    OUTPUT_HEADER = 'row,pattern_detected,confidence\n'
+
+    def __init__(self,
+                 circuit_manager: Optional[CircuitManager] = None,
+                 chunk_size: int = 256,
+                 shots: int = 1000):
+        """
+        Initialize the pipeline
+
+        Args:
+            circuit_manager: Circuit manager instance. If None, creates a new one.
+            chunk_size: Number of rows executed per batch
+            shots: Number of circuit repetitions per row
+        """
+        self.circuit_manager = circuit_manager or CircuitManager()
+        self.chunk_size = chunk_size
+        self.shots = shots
+
+    def run(self,
+            input_path: PathLike,
+            output_path: PathLike,
+            checkpoint_path: Optional[PathLike] = None) -> Dict:
+        """
+        Classify every row of a dataset, resuming from a checkpoint if present
+
+        Args:
+            input_path: CSV or NPY file with one input vector per row
+            output_path: CSV file results are appended to
+            checkpoint_path: Progress file (defaults to output_path + '.ckpt')
+
+        Returns:
+            Dict summarizing the run
+        """
+        input_path = Path(input_path)
+        output_path = Path(output_path)
+        checkpoint_path = Path(checkpoint_path or f"{output_path}.ckpt")
+
+        try:
+            checkpoint = self._load_checkpoint(checkpoint_path, input_path)
+            if checkpoint.get('complete'):
+                logger.info(f"{input_path} already fully classified")
+                return {'rows': checkpoint['rows_done'], 'resumed_from': checkpoint['rows_done']}
+
+            resumed_from = checkpoint['rows_done']
+            if resumed_from:
+                logger.info(f"Resuming {input_path} at row {resumed_from}")
+
+            with open(output_path, 'a+b') as output:
+                # Drop anything written after the last checkpoint
+                output.truncate(checkpoint['output_offset'])
+                output.seek(0, os.SEEK_END)
+                if output.tell() == 0:
+                    output.write(self.OUTPUT_HEADER.encode('utf-8'))
+
+                for rows, input_offset in self._read_chunks(input_path, checkpoint):
+                    outcomes = self.circuit_manager.run_pattern_recognition_batch(
+                        rows, shots=self.shots
+                    )
+                    lines = [
+                        f"{checkpoint['rows_done'] + i},{int(o['pattern_detected'])},{o['confidence']:.6f}\n"
+                        for i, o in enumerate(outcomes)
+                    ]
+                    output.write(''.join(lines).encode('utf-8'))
+                    output.flush()
+                    os.fsync(output.fileno())
+
+                    checkpoint['rows_done'] += len(rows)
+                    checkpoint['input_offset'] = input_offset
+                    checkpoint['output_offset'] = output.tell()
+                    self._save_checkpoint(checkpoint_path, checkpoint)
+                    logger.info(f"Classified {checkpoint['rows_done']} rows")
+
+            checkpoint['complete'] = True
+            self._save_checkpoint(checkpoint_path, checkpoint)
+            return {'rows': checkpoint['rows_done'], 'resumed_from': resumed_from}
+
+        except Exception as e:
+            logger.error(f"Classification pipeline failed: {str(e)}")
+            raise
+
+    def _read_chunks(self, input_path: Path, checkpoint: Dict) -> Iterator[Tuple[List[List[float]], int]]:
+        """Yield (rows, input offset after the chunk) starting at the checkpoint"""
+        if input_path.suffix.lower() == '.npy':
+            yield from self._read_npy_chunks(input_path, checkpoint['rows_done'])
+        else:
+            yield from self._read_csv_chunks(input_path, checkpoint['input_offset'])
+
+    def _read_npy_chunks(self, input_path: Path, start_row: int) -> Iterator[Tuple[List[List[float]], int]]:
+        """Read chunks from a memory-mapped NPY array"""
+        data = np.load(input_path, mmap_mode='r')
+        if data.ndim == 1:
+            data = data.reshape(-1, 1)
+        for start in range(start_row, data.shape[0], self.chunk_size):
+            stop = min(start + self.chunk_size, data.shape[0])
+            yield np.asarray(data[start:stop], dtype=float).tolist(), stop
+
+    def _read_csv_chunks(self, input_path: Path, offset: int) -> Iterator[Tuple[List[List[float]], int]]:
+        """Read chunks from a CSV file, seeking to a byte offset"""
+        with open(input_path, 'rb') as f:
+            f.seek(offset)
+            rows: List[List[float]] = []
+            while True:
+                line = f.readline()
+                if line:
+                    text = line.decode('utf-8').strip()
+                    if text:
+                        row = next(csv.reader([text]))
+                        try:
+                            rows.append([float(x) for x in row])
+                        except ValueError:
+                            if offset == 0 and f.tell() == len(line):
+                                continue  # header row
+                            raise
+                if rows and (len(rows) == self.chunk_size or not line):
+                    yield rows, f.tell()
+                    rows = []
+                if not line:
+                    return
+
+    @staticmethod
+    def _load_checkpoint(checkpoint_path: Path, input_path: Path) -> Dict:
+        """Load a checkpoint, or start fresh if none matches the input"""
+        if checkpoint_path.exists():
+            with open(checkpoint_path, 'r') as f:
+                checkpoint = json.load(f)
+            if checkpoint.get('input_path') == str(input_path):
+                return checkpoint
+            logger.warning(f"Ignoring checkpoint for a different input: {checkpoint_path}")
+        return {
+            'input_path': str(input_path),
+            'rows_done': 0,
+            'input_offset': 0,
+            'output_offset': 0
+        }
+
+    @staticmethod
+    def _save_checkpoint(checkpoint_path: Path, checkpoint: Dict):
+        """Atomically replace the checkpoint file"""
+        tmp_path = checkpoint_path.with_name(checkpoint_path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(checkpoint, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, checkpoint_path)
@@ -0,0 +1,291 @@
+"""
+Prefix Cache Module
+=================
+
+Incremental statevector simulation for families of circuits that share
+leading layers. Intermediate states are cached at moment boundaries in a trie
+keyed by the circuit's moments, so a new circuit resumes from its longest
+cached prefix and only simulates the moments that differ.
+"""
+
+import logging
+import threading
+import cirq
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+class _TrieNode:
+    """One moment boundary in the prefix trie"""
+    __slots__ = ('parent', 'key', 'children', 'state')
+
+    def __init__(self, parent: Optional['_TrieNode'] = None, key=None):
+        self.parent = parent
+        self.key = key
+        self.children: Dict[cirq.Moment, '_TrieNode'] = {}
+        self.state: Optional[np.ndarray] = None
+
+class PrefixStateCache:
+    """Memory-bounded trie of statevectors indexed by circuit prefix"""
+
+    def __init__(self, max_bytes: int):
+        """
+        Initialize the cache
+
+        Args:
+            max_bytes: Upper bound on the total size of cached statevectors
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.reused_moments = 0
+        self._roots: Dict[Tuple, _TrieNode] = {}
+        # Nodes holding a state, least recently used first
+        self._lru: 'OrderedDict[int, _TrieNode]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, root_key: Tuple, moments: Sequence[cirq.Moment]) -> Tuple[int, Optional[np.ndarray], List[_TrieNode]]:
+        """
+        Find the longest cached prefix of a moment sequence
+
+        Args:
+            root_key: Identifies the qubit order and precision
+            moments: Moments of the circuit
+
+        Returns:
+            (number of cached moments, cached state or None, trie path)
+        """
+        with self._lock:
+            node = self._roots.get(root_key)
+            if node is None:
+                node = self._roots[root_key] = _TrieNode(key=root_key)
+            path = [node]
+            depth, state = 0, None
+            for i, moment in enumerate(moments):
+                node = node.children.get(moment)
+                if node is None:
+                    break
+                path.append(node)
+                if node.state is not None:
+                    depth, state = i + 1, node.state
+                    self._lru.move_to_end(id(node))
+
+            if depth:
+                self.hits += 1
+                self.reused_moments += depth
+            else:
+                self.misses += 1
+            return depth, state, path[:depth + 1]
+
+    def insert(self, parent: _TrieNode, moment: cirq.Moment, state: Optional[np.ndarray]) -> Optional[_TrieNode]:
+        """
+        Cache the state reached after applying a moment to a prefix
+
+        Args:
+            parent: Trie node of the prefix
+            moment: The moment applied
+            state: Statevector after the moment, or None to only extend the
+                path towards a deeper cached state
+
+        Returns:
+            Trie node of the extended prefix, or None if the state can never
+            fit the cache (longer prefixes of the circuit cannot either)
+        """
+        with self._lock:
+            if state is not None and state.nbytes > self.max_bytes:
+                self._prune(parent)
+                return None
+            node = parent.children.get(moment)
+            if node is None:
+                node = parent.children[moment] = _TrieNode(parent, moment)
+            if state is None:
+                return node
+            if node.state is None:
+                state.flags.writeable = False
+                node.state = state
+                self.nbytes += state.nbytes
+                self._lru[id(node)] = node
+            self._lru.move_to_end(id(node))
+            self._evict()
+            return node
+
+    def _evict(self):
+        """Drop least recently used states until the cache fits its budget"""
+        while self.nbytes > self.max_bytes and self._lru:
+            _, node = self._lru.popitem(last=False)
+            self.nbytes -= node.state.nbytes
+            node.state = None
+            self._prune(node)
+
+    def _prune(self, node: _TrieNode):
+        """Remove a branch, up to and including its root, that no longer leads to any cached state"""
+        while node.state is None and not node.children:
+            if node.parent is None:
+                if self._roots.get(node.key) is node:
+                    del self._roots[node.key]
+                return
+            del node.parent.children[node.key]
+            node = node.parent
+
+    @property
+    def node_count(self) -> int:
+        """Number of trie nodes, including roots"""
+        with self._lock:
+            count, stack = 0, list(self._roots.values())
+            while stack:
+                node = stack.pop()
+                count += 1
+                stack.extend(node.children.values())
+            return count
+
+    def clear(self):
+        """Remove every cached state"""
+        with self._lock:
+            self._roots.clear()
+            self._lru.clear()
+            self.nbytes = 0
+
+class PrefixCachingSimulator:
+    """Statevector simulator that resumes circuits from cached prefixes"""
+
+    def __init__(self,
+                 simulator: cirq.Simulator,
+                 cache: PrefixStateCache,
+                 dtype: type = np.complex64,
+                 seed: Optional[int] = None):
+        """
+        Initialize the simulator
+
+        Args:
+            simulator: Statevector simulator used for the uncached moments
+            cache: Prefix cache shared between runs
+            dtype: Complex dtype the wrapped simulator was created with
+            seed: Seed for measurement sampling
+        """
+        self.simulator = simulator
+        self.cache = cache
+        self.dtype = np.dtype(dtype)
+        self._rng = np.random.default_rng(seed)
+
+    def run(self,
+            program: cirq.Circuit,
+            param_resolver: cirq.ParamResolverOrSimilarType = None,
+            repetitions: int = 1) -> cirq.Result:
+        """
+        Sample a circuit, reusing cached prefix states where possible
+
+        Circuits with mid-circuit measurements or non-unitary operations, and
+        circuits whose statevector can never fit the cache, are passed
+        through to the wrapped simulator unchanged.
+
+        Args:
+            program: Circuit to run
+            param_resolver: Parameters for the circuit
+            repetitions: Number of samples
+
+        Returns:
+            cirq.Result with the sampled measurements
+        """
+        resolver = cirq.ParamResolver(param_resolver)
+        circuit = cirq.resolve_parameters(program, resolver)
+        measurements = [op for op in circuit.all_operations() if cirq.is_measurement(op)]
+        unitary_ops = [op for op in circuit.all_operations() if not cirq.is_measurement(op)]
+        if not measurements:
+            return cirq.ResultDict(params=resolver, measurements={})
+
+        qubits = tuple(cirq.QubitOrder.DEFAULT.order_for(circuit.all_qubits()))
+        if (not circuit.are_all_measurements_terminal()
+                or not all(cirq.has_unitary(op) for op in unitary_ops)
+                or 2 ** len(qubits) * self.dtype.itemsize > self.cache.max_bytes):
+            return self.simulator.run(circuit, repetitions=repetitions)
+
+        moments = [
+            cirq.Moment(op for op in moment if not cirq.is_measurement(op))
+            for moment in circuit
+        ]
+        while moments and not moments[-1].operations:
+            moments.pop()
+
+        state = self._final_state(qubits, moments)
+        return cirq.ResultDict(
+            params=resolver,
+            measurements=self._sample(state, qubits, measurements, repetitions)
+        )
+
+    def run_batch(self,
+                  programs: Sequence[cirq.Circuit],
+                  params_list: Optional[Sequence[cirq.Sweepable]] = None,
+                  repetitions=1) -> List[List[cirq.Result]]:
+        """Run several circuits, sharing the prefix cache between them"""
+        params_list = params_list or [None] * len(programs)
+        if isinstance(repetitions, int):
+            repetitions = [repetitions] * len(programs)
+        return [
+            [self.run(program, resolver, repetitions=n) for resolver in cirq.to_resolvers(params)]
+            for program, params, n in zip(programs, params_list, repetitions)
+        ]
+
+    def _final_state(self, qubits: Tuple[cirq.Qid, ...], moments: List[cirq.Moment]) -> np.ndarray:
+        """Simulate the unitary part of a circuit from its longest cached prefix"""
+        root_key = (qubits, self.dtype.name)
+        depth, state, path = self.cache.lookup(root_key, moments)
+        node = path[-1]
+
+        if depth == len(moments) and state is not None:
+            return state
+
+        # LRU eviction keeps only the most recent states, so of this run's
+        # states only the deepest ones that fit the budget would survive;
+        # the moments before them are recorded as path nodes only
+        capacity = self.cache.max_bytes // (2 ** len(qubits) * self.dtype.itemsize)
+        first_cached = max(depth, len(moments) - capacity)
+
+        # A cold run starts from |0> without an explicit initial state so the
+        # wrapped simulator can keep unentangled qubits in separate states;
+        # dense statevectors are only materialized for states being cached
+        if state is None:
+            initial_state, state = 0, np.zeros(2 ** len(qubits), dtype=self.dtype)
+            state[0] = 1
+        else:
+            initial_state = state.copy()
+        remaining = cirq.Circuit(moments[depth:])
+        step, state_depth = None, depth
+        for i, (moment, step) in enumerate(zip(moments[depth:], self.simulator.simulate_moment_steps(
+                remaining, initial_state=initial_state, qubit_order=qubits)), start=depth):
+            if node is None:
+                continue
+            if i < first_cached:
+                node = self.cache.insert(node, moment, None)
+                continue
+            # Steps can come back as views into simulator buffers; copy before caching
+            state, state_depth = step.state_vector(copy=True), i + 1
+            node = self.cache.insert(node, moment, state)
+        if state_depth < len(moments):
+            state = step.state_vector(copy=False)
+        return state
+
+    def _sample(self,
+                state: np.ndarray,
+                qubits: Tuple[cirq.Qid, ...],
+                measurements: List[cirq.Operation],
+                repetitions: int) -> Dict[str, np.ndarray]:
+        """Sample all terminal measurements jointly from the final state"""
+        if not measurements:
+            return {}
+        indices = [qubits.index(q) for op in measurements for q in op.qubits]
+        bits = cirq.sample_state_vector(state, indices, repetitions=repetitions, seed=self._rng)
+
+        results = {}
+        offset = 0
+        for op in measurements:
+            width = len(op.qubits)
+            values = bits[:, offset:offset + width].astype(np.int8)
+            invert_mask = op.gate.full_invert_mask()
+            if any(invert_mask):
+                values ^= np.array(invert_mask, dtype=np.int8)
+            results[cirq.measurement_key_name(op)] = values
+            offset += width
+        return results
@@ -7,14 +7,21 @@ including simulation capabilities using Cirq.
 """
 
 import cirq
+import sympy
 import numpy as np
 import logging
-from typing import Dict, List, Optional, Union
+from typing import Callable, Dict, List, Optional, Union
 from dataclasses import dataclass
 from enum import Enum
 import win32event
 import win32service
 import win32serviceutil
+from .calibration import CalibrationManager, CalibrationSnapshot
+from .cost_model import BackendRouter, CostBudgetExceeded, CostEstimate, CostModel
+from .prefix_cache import PrefixCachingSimulator, PrefixStateCache
+from .accuracy import precision_dtype
+from .gradients import adjoint_gradient
+from .trajectory import BatchedTrajectorySimulator
 
 # Configure logging
 logging.basicConfig(
@@ -45,22 +52,79 @@ class QPUConfig:
     coherence_time_us: float = 100.0
     gate_fidelity: float = 0.99
     measurement_fidelity: float = 0.98
+    calibration_interval_s: Optional[float] = None
+    calibration_drift_threshold: float = 0.01
+    calibration_probe_interval_s: float = 5.0
+    max_memory_mb: float = 4096.0
+    max_runtime_s: Optional[float] = None
+    allow_downscale: bool = False
+    prefix_cache_mb: float = 0.0
+    precision: str = 'complex64'
+    simulate_noise: bool = False
+    gate_time_us: float = 0.05
 
 class QPUInterface:
     """Main interface for QPU operations"""
     
-    def __init__(self, config: Optional[QPUConfig] = None):
-        """Initialize the QPU interface with given or default configuration"""
+    def __init__(self,
+                 config: Optional[QPUConfig] = None,
+                 drift_probe: Optional[Callable[[], Dict[str, float]]] = None):
+        """
+        Initialize the QPU interface with given or default configuration
+        
+        Args:
+            config: QPU configuration. If None, uses the defaults.
+            drift_probe: Callable returning observed 'gate_fidelity' and/or
+                'measurement_fidelity'; polled every calibration_probe_interval_s
+                to trigger recalibration on drift
+        """
         self.config = config or QPUConfig()
         self.status = QPUStatus.READY
-        self.simulator = cirq.Simulator()
+        self.dtype = precision_dtype(self.config.precision)
+        self.simulator = cirq.Simulator(dtype=self.dtype)
+        self.simulators = {
+            CostModel.STATEVECTOR: self.simulator,
+            CostModel.DENSITY_MATRIX: cirq.DensityMatrixSimulator(dtype=self.dtype),
+            CostModel.CLIFFORD: cirq.CliffordSimulator(),
+        }
+        self.router = BackendRouter(
+            self.config, CostModel(itemsize=np.dtype(self.dtype).itemsize)
+        )
+        self.prefix_cache: Optional[PrefixStateCache] = None
+        if self.config.prefix_cache_mb > 0:
+            # Resume statevector runs from cached shared prefixes
+            self.prefix_cache = PrefixStateCache(int(self.config.prefix_cache_mb * 2 ** 20))
+            self.simulators[CostModel.STATEVECTOR] = PrefixCachingSimulator(
+                self.simulator, self.prefix_cache, dtype=self.dtype
+            )
         self.qubits = [cirq.GridQubit(i, 0) for i in range(self.config.num_qubits)]
+        self.calibration = CalibrationManager(
+            self.config,
+            drift_threshold=self.config.calibration_drift_threshold
+        )
+        # Noisy runs driven by the calibrated fidelities
+        self.simulators[CostModel.TRAJECTORY] = BatchedTrajectorySimulator(
+            self.calibration.current(), self.config.gate_time_us, dtype=self.dtype
+        )
+        if self.config.calibration_interval_s or drift_probe is not None:
+            self.calibration.start(
+                interval_s=self.config.calibration_interval_s,
+                probe=drift_probe,
+                probe_interval_s=self.config.calibration_probe_interval_s
+            )
         logger.info(f"Initialized QPU Interface with {self.config.num_qubits} qubits")
         
     def check_status(self) -> QPUStatus:
         """Check the current status of the QPU"""
-        logger.info(f"Current QPU status: {self.status.value}")
-        return self.status
+        status = self.status
+        if status == QPUStatus.READY and self.calibration.in_progress:
+            status = QPUStatus.CALIBRATING
+        logger.info(f"Current QPU status: {status.value}")
+        return status
+    
+    def current_calibration(self) -> CalibrationSnapshot:
+        """Return the calibration snapshot new jobs will run against"""
+        return self.calibration.current()
     
     def create_circuit(self, operations: List[Dict]) -> cirq.Circuit:
         """
@@ -71,7 +135,8 @@ class QPUInterface:
                 Each dict should have:
                 - 'gate': str (e.g., 'H', 'CNOT', 'X', 'Y', 'Z')
                 - 'qubits': List[int] (qubit indices)
-                - 'params': Optional[float] (for parameterized gates)
+                - 'params': Optional[float] (for parameterized gates); a str
+                  creates a sympy symbol of that name
         
         Returns:
             cirq.Circuit: The constructed quantum circuit
@@ -83,6 +148,8 @@ class QPUInterface:
                 gate_type = op['gate'].upper()
                 qubit_indices = op['qubits']
                 params = op.get('params')
+                if isinstance(params, str):
+                    params = sympy.Symbol(params)
                 
                 # Get the target qubits
                 target_qubits = [self.qubits[i] for i in qubit_indices]
@@ -117,6 +184,96 @@ class QPUInterface:
             logger.error(f"Error creating circuit: {str(e)}")
             raise
     
+    def plan_execution(self,
+                       circuit: cirq.Circuit,
+                       shots: int = 1000,
+                       noisy: bool = False,
+                       strategies: Optional[List[str]] = None) -> CostEstimate:
+        """
+        Estimate the cost of a job and choose its simulation strategy
+        
+        Args:
+            circuit: The quantum circuit to execute
+            shots: Number of repetitions
+            noisy: Whether the job runs with a noise model
+            strategies: Candidate strategies (defaults to the router's defaults)
+            
+        Returns:
+            CostEstimate for the chosen strategy
+            
+        Raises:
+            CostBudgetExceeded: If the job does not fit the configured budget
+        """
+        try:
+            return self.router.plan(circuit, shots, noisy=noisy, strategies=strategies)
+        except CostBudgetExceeded as e:
+            logger.error(f"Job rejected: {str(e)}")
+            raise
+    
+    def create_observable(self, terms: Dict[str, float]) -> cirq.PauliSum:
+        """
+        Create an observable from weighted Pauli strings
+        
+        Args:
+            terms: Mapping of Pauli strings to weights. Character i of each
+                string ('I', 'X', 'Y' or 'Z') acts on qubit i, e.g. {'ZZ': 0.5}
+        
+        Returns:
+            cirq.PauliSum: The weighted sum of Pauli strings
+        """
+        paulis = {'X': cirq.X, 'Y': cirq.Y, 'Z': cirq.Z}
+        observable = cirq.PauliSum()
+        for pauli_string, weight in terms.items():
+            if len(pauli_string) > len(self.qubits):
+                raise ValueError(f"Pauli string '{pauli_string}' is longer than "
+                                 f"the {len(self.qubits)} available qubits")
+            observable += cirq.PauliString(
+                {self.qubits[i]: paulis[p] for i, p in enumerate(pauli_string.upper()) if p != 'I'},
+                coefficient=weight
+            )
+        return observable
+    
+    def gradient(self,
+                 circuit: cirq.Circuit,
+                 observable: Union[cirq.PauliSum, Dict[str, float]],
+                 param_resolver: Optional[Dict[str, float]] = None) -> Dict:
+        """
+        Compute an expectation value and its exact gradient
+        
+        Uses adjoint differentiation, which costs a forward and a backward
+        statevector pass regardless of the number of parameters.
+        
+        Args:
+            circuit: Circuit with sympy symbols in its gate exponents
+            observable: PauliSum, or weighted Pauli strings for create_observable
+            param_resolver: Values of the circuit's symbols
+            
+        Returns:
+            Dict with 'expectation' and per-symbol 'gradients'
+        """
+        if not self.config.simulation_mode:
+            # Hardware would need parameter-shift sampling instead
+            raise NotImplementedError("Hardware gradients not implemented")
+        
+        try:
+            if isinstance(observable, dict):
+                observable = self.create_observable(observable)
+            
+            qubits = sorted(circuit.all_qubits() | set(observable.qubits))
+            expectation, gradients = adjoint_gradient(
+                circuit, observable, qubits, param_resolver, dtype=self.dtype
+            )
+            
+            logger.info(f"Computed gradient for {len(gradients)} parameters")
+            return {
+                'expectation': expectation,
+                'gradients': gradients
+            }
+            
+        except Exception as e:
+            logger.error(f"Error computing gradient: {str(e)}")
+            raise
+    
     def execute_circuit(self, 
                        circuit: cirq.Circuit, 
                        shots: int = 1000,
@@ -131,10 +288,27 @@ class QPUInterface:
             
         Returns:
             Dict containing execution results
+            
+        Raises:
+            CostBudgetExceeded: If the job does not fit the configured budget
         """
+        # Reject infeasible jobs before anything is allocated
+        plan = None
+        if self.config.simulation_mode:
+            if noise_model is None and self.config.simulate_noise:
+                # Calibration-driven noise on the batched trajectory engine
+                plan = self.plan_execution(circuit, shots, noisy=True,
+                                           strategies=[CostModel.TRAJECTORY])
+            else:
+                plan = self.plan_execution(circuit, shots, noisy=noise_model is not None)
+            shots = plan.shots
+        
         try:
             self.status = QPUStatus.BUSY
             
+            # Pin the calibration for the lifetime of this job
+            calibration = self.calibration.current()
+            
             # Add noise model if provided
             if noise_model and self.config.simulation_mode:
                 noisy_circuit = circuit.with_noise(noise_model)
@@ -144,7 +318,8 @@ class QPUInterface:
             # Execute circuit
             if self.config.simulation_mode:
                 self.status = QPUStatus.SIMULATING
-                result = self.simulator.run(noisy_circuit, repetitions=shots)
+                simulator = self._simulator_for(plan.strategy, calibration)
+                result = simulator.run(noisy_circuit, repetitions=shots)
             else:
                 # Here we would interface with actual QPU hardware
                 raise NotImplementedError("Hardware QPU interface not implemented")
@@ -159,7 +334,9 @@ class QPUInterface:
             return {
                 'counts': counts,
                 'measurements': measurements,
-                'shots': shots
+                'shots': shots,
+                'calibration': calibration,
+                'backend': plan.strategy if plan else 'hardware'
             }
             
         except Exception as e:
@@ -167,6 +344,76 @@ class QPUInterface:
             logger.error(f"Error executing circuit: {str(e)}")
             raise
     
+    def execute_batch(self,
+                      circuits: List[cirq.Circuit],
+                      shots: int = 1000) -> List[Dict]:
+        """
+        Execute several circuits as one batch
+        
+        Circuits routed to the same strategy are submitted to that simulator
+        in a single run_batch call.
+        
+        Args:
+            circuits: The quantum circuits to execute
+            shots: Number of repetitions per circuit
+            
+        Returns:
+            List of result dicts in the order of the input circuits
+            
+        Raises:
+            CostBudgetExceeded: If any job does not fit the configured budget
+        """
+        if not self.config.simulation_mode:
+            # Here we would interface with actual QPU hardware
+            raise NotImplementedError("Hardware QPU interface not implemented")
+        
+        # Reject the whole batch before anything is allocated
+        if self.config.simulate_noise:
+            plans = [self.plan_execution(circuit, shots, noisy=True,
+                                         strategies=[CostModel.TRAJECTORY])
+                     for circuit in circuits]
+        else:
+            plans = [self.plan_execution(circuit, shots) for circuit in circuits]
+        
+        try:
+            self.status = QPUStatus.SIMULATING
+            calibration = self.calibration.current()
+            
+            by_strategy: Dict[str, List[int]] = {}
+            for i, plan in enumerate(plans):
+                by_strategy.setdefault(plan.strategy, []).append(i)
+            
+            batch_results: List[Optional[Dict]] = [None] * len(circuits)
+            for strategy, indices in by_strategy.items():
+                results = self._simulator_for(strategy, calibration).run_batch(
+                    [circuits[i] for i in indices],
+                    repetitions=[plans[i].shots for i in indices]
+                )
+                for i, (result,) in zip(indices, results):
+                    batch_results[i] = {
+                        'counts': {k: result.histogram(key=k) for k in result.measurements},
+                        'measurements': result.measurements,
+                        'shots': plans[i].shots,
+                        'calibration': calibration,
+                        'backend': strategy
+                    }
+            
+            self.status = QPUStatus.READY
+            logger.info(f"Batch of {len(circuits)} circuits executed successfully")
+            return batch_results
+            
+        except Exception as e:
+            self.status = QPUStatus.ERROR
+            logger.error(f"Error executing batch: {str(e)}")
+            raise
+    
+    def _simulator_for(self, strategy: str, calibration: CalibrationSnapshot):
+        """Return the simulator for a strategy, bound to the pinned calibration"""
+        simulator = self.simulators[strategy]
+        if strategy == CostModel.TRAJECTORY:
+            return simulator.with_calibration(calibration)
+        return simulator
+    
     def apply_error_mitigation(self, results: Dict) -> Dict:
         """
         Apply error mitigation techniques to raw results
@@ -181,10 +428,11 @@ class QPUInterface:
             # Simple error mitigation strategy
             # In a real implementation, this would be more sophisticated
             mitigated_results = results.copy()
+            calibration = results.get('calibration') or self.calibration.current()
             
             for key, counts in results['counts'].items():
                 total = sum(counts.values())
-                threshold = total * self.config.error_rate
+                threshold = total * calibration.error_rate
                 
                 # Filter out counts below noise threshold
                 mitigated_counts = {
@@ -201,35 +449,36 @@ class QPUInterface:
             logger.error(f"Error in error mitigation: {str(e)}")
             raise
 
-    def calibrate(self) -> bool:
+    def calibrate(self, wait: bool = False) -> bool:
         """
-        Perform QPU calibration
+        Perform QPU calibration in the background
+        
+        Running jobs keep the calibration snapshot they started with; jobs
+        submitted after the run completes switch to the new snapshot. Use
+        calibration.request_calibration() to get a future for the run.
+        
+        Args:
+            wait: Block until the calibration run has finished
         
         Returns:
-            bool: True if calibration was successful
+            bool: True if calibration was successful (or was scheduled, when not waiting)
         """
         try:
-            self.status = QPUStatus.CALIBRATING
-            logger.info("Starting QPU calibration...")
-            
-            if self.config.simulation_mode:
-                # Simulate calibration process
-                import time
-                time.sleep(1)  # Simulate calibration time
-                
-                # Reset error rates and fidelities
-                self.config.error_rate = 0.001
-                self.config.gate_fidelity = 0.99
-                self.config.measurement_fidelity = 0.98
-            else:
-                # Here we would perform actual hardware calibration
-                raise NotImplementedError("Hardware calibration not implemented")
-            
-            self.status = QPUStatus.READY
-            logger.info("Calibration completed successfully")
+            future = self.calibration.request_calibration()
+            if wait:
+                future.result()
             return True
             
         except Exception as e:
-            self.status = QPUStatus.ERROR
             logger.error(f"Calibration failed: {str(e)}")
             return False
+    
+    def close(self):
+        """Stop background calibration and release its threads"""
+        self.calibration.close()
+    
+    def __enter__(self) -> 'QPUInterface':
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,301 @@
+"""
+Scheduler Module
+==============
+
+Multi-tenant job scheduling for the QPU service. Long jobs are split into
+shot chunks that are interleaved with two-level start-time fair queuing:
+tenants share the QPU according to their weights, and within a tenant's
+share its priority levels are weighted against each other. A large batch
+job only gets its tenant's share and interactive work waits for at most one
+chunk.
+Jobs can be preempted between chunks and resumed later; partial histograms
+are merged as chunks complete.
+"""
+
+import logging
+import itertools
+import threading
+import cirq
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Deque, Dict, List, Optional, Tuple
+from .qpu_interface import QPUInterface
+from .sharding import merge_counts
+
+logger = logging.getLogger(__name__)
+
+class JobState(Enum):
+    """Lifecycle states of a scheduled job"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    PAUSED = "paused"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+@dataclass
+class ScheduledJob:
+    """A job split into shot chunks"""
+    job_id: int
+    tenant: str
+    priority: int
+    circuit: cirq.Circuit
+    shots: int
+    chunk_shots: int
+    chunk_cost: float
+    state: JobState = JobState.QUEUED
+    completed_shots: int = 0
+    chunks_run: int = 0
+    counts: Dict = field(default_factory=dict)
+    error: Optional[str] = None
+    _done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def remaining_shots(self) -> int:
+        return self.shots - self.completed_shots
+
+    def result(self, timeout: Optional[float] = None) -> Dict:
+        """
+        Wait for the job and return its merged results
+
+        Args:
+            timeout: Seconds to wait; None waits forever
+
+        Returns:
+            Dict containing the merged counts
+        """
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"Job {self.job_id} did not finish within {timeout}s")
+        if self.state != JobState.DONE:
+            raise RuntimeError(f"Job {self.job_id} {self.state.value}: {self.error}")
+        return {
+            'counts': self.counts,
+            'shots': self.completed_shots,
+            'chunks': self.chunks_run
+        }
+
+class FairShareScheduler:
+    """Weighted fair queuing of shot chunks across tenants and priorities"""
+
+    def __init__(self,
+                 qpu_interface: Optional[QPUInterface] = None,
+                 chunk_shots: int = 10000,
+                 tenant_weights: Optional[Dict[str, float]] = None):
+        """
+        Initialize the scheduler
+
+        Args:
+            qpu_interface: QPU interface instance. If None, creates a new one.
+            chunk_shots: Default maximum number of shots per chunk
+            tenant_weights: Relative share of each tenant (default 1.0)
+        """
+        self.qpu = qpu_interface or QPUInterface()
+        self.chunk_shots = chunk_shots
+        self.tenant_weights = dict(tenant_weights or {})
+
+        self._jobs: Dict[int, ScheduledJob] = {}
+        self._flows: Dict[Tuple[str, int], Deque[ScheduledJob]] = {}
+        # Level 1: one virtual clock across tenants, finish tag per tenant
+        self._virtual_time = 0.0
+        self._tenant_tags: Dict[str, float] = {}
+        # Level 2: a virtual clock per tenant, finish tag per priority flow
+        self._tenant_time: Dict[str, float] = {}
+        self._finish_tags: Dict[Tuple[str, int], float] = {}
+        self._ids = itertools.count(1)
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def set_tenant_weight(self, tenant: str, weight: float):
+        """Change a tenant's relative share"""
+        with self._condition:
+            self.tenant_weights[tenant] = weight
+
+    def submit(self,
+               circuit: cirq.Circuit,
+               shots: int,
+               tenant: str = 'default',
+               priority: int = 1,
+               chunk_shots: Optional[int] = None) -> ScheduledJob:
+        """
+        Queue a job
+
+        Args:
+            circuit: The quantum circuit to execute
+            shots: Total number of repetitions
+            tenant: Tenant the job is accounted to
+            priority: Relative weight of the job within its tenant (>= 1)
+            chunk_shots: Override of the maximum shots per chunk
+
+        Returns:
+            ScheduledJob handle
+
+        Raises:
+            CostBudgetExceeded: If a chunk of the job does not fit the QPU budget
+        """
+        if priority < 1:
+            raise ValueError("Priority must be at least 1")
+        chunk_shots = min(chunk_shots or self.chunk_shots, shots)
+        # Cost is accounted in predicted seconds so cheap and expensive
+        # circuits are shared fairly, not just shot counts
+        chunk_cost = self.qpu.plan_execution(circuit, chunk_shots).runtime_s
+
+        with self._condition:
+            job = ScheduledJob(
+                job_id=next(self._ids),
+                tenant=tenant,
+                priority=priority,
+                circuit=circuit,
+                shots=shots,
+                chunk_shots=chunk_shots,
+                chunk_cost=chunk_cost
+            )
+            self._jobs[job.job_id] = job
+            self._flows.setdefault((tenant, priority), deque()).append(job)
+            self._condition.notify_all()
+
+        logger.info(f"Queued job {job.job_id} for tenant {tenant} "
+                    f"({shots} shots in chunks of {chunk_shots})")
+        return job
+
+    def preempt(self, job_id: int) -> bool:
+        """Pause a job after its current chunk; returns False if it cannot be paused"""
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or job.state not in (JobState.QUEUED, JobState.RUNNING):
+                return False
+            job.state = JobState.PAUSED
+            logger.info(f"Preempted job {job_id} at {job.completed_shots}/{job.shots} shots")
+            return True
+
+    def resume(self, job_id: int) -> bool:
+        """Make a paused job runnable again"""
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or job.state != JobState.PAUSED:
+                return False
+            job.state = JobState.QUEUED
+            self._condition.notify_all()
+            return True
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancel a job that has not finished"""
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or job.state in (JobState.DONE, JobState.FAILED, JobState.CANCELLED):
+                return False
+            self._finish(job, JobState.CANCELLED, "cancelled")
+            return True
+
+    def pending(self) -> List[ScheduledJob]:
+        """Jobs that are queued, running or paused"""
+        with self._condition:
+            return [job for queue in self._flows.values() for job in queue]
+
+    def _next_chunk(self) -> Optional[Tuple[ScheduledJob, int]]:
+        """
+        Pick the next chunk (caller holds the lock)
+
+        The tenant with the smallest start tag wins, so spreading jobs over
+        several priorities does not enlarge a tenant's share; the tenant's
+        priority flow with the smallest start tag then supplies the chunk.
+        """
+        runnable: Dict[str, List[Tuple[Tuple[str, int], ScheduledJob]]] = {}
+        for flow, queue in self._flows.items():
+            job = next((j for j in queue if j.state == JobState.QUEUED), None)
+            if job is not None:
+                runnable.setdefault(flow[0], []).append((flow, job))
+        if not runnable:
+            return None
+
+        tenant_start, tenant = min(
+            (max(self._virtual_time, self._tenant_tags.get(t, 0.0)), t) for t in runnable
+        )
+        tenant_time = self._tenant_time.get(tenant, 0.0)
+        flow_start, flow, job = min(
+            ((max(tenant_time, self._finish_tags.get(f, 0.0)), f, j) for f, j in runnable[tenant]),
+            key=lambda candidate: candidate[0]
+        )
+
+        self._virtual_time = tenant_start
+        self._tenant_tags[tenant] = tenant_start + job.chunk_cost / self.tenant_weights.get(tenant, 1.0)
+        self._tenant_time[tenant] = flow_start
+        self._finish_tags[flow] = flow_start + job.chunk_cost / flow[1]
+        job.state = JobState.RUNNING
+        return job, min(job.chunk_shots, job.remaining_shots)
+
+    def _finish(self, job: ScheduledJob, state: JobState, error: Optional[str] = None):
+        """Retire a job (caller holds the lock)"""
+        job.state = state
+        job.error = error
+        queue = self._flows.get((job.tenant, job.priority))
+        if queue is not None and job in queue:
+            queue.remove(job)
+            if not queue:
+                del self._flows[(job.tenant, job.priority)]
+        job._done.set()
+
+    def step(self) -> bool:
+        """
+        Execute one chunk
+
+        Returns:
+            bool: False if no job was runnable
+        """
+        with self._condition:
+            selected = self._next_chunk()
+        if selected is None:
+            return False
+        job, shots = selected
+
+        try:
+            results = self.qpu.execute_circuit(job.circuit, shots=shots)
+        except Exception as e:
+            with self._condition:
+                self._finish(job, JobState.FAILED, str(e))
+            logger.error(f"Job {job.job_id} failed: {str(e)}")
+            return True
+
+        with self._condition:
+            if job.state == JobState.CANCELLED:
+                return True
+            job.counts = merge_counts([job.counts, results['counts']])
+            job.completed_shots += results['shots']
+            job.chunks_run += 1
+            if job.remaining_shots <= 0:
+                self._finish(job, JobState.DONE)
+                logger.info(f"Job {job.job_id} completed in {job.chunks_run} chunks")
+            elif job.state == JobState.RUNNING:
+                job.state = JobState.QUEUED
+        return True
+
+    def start(self):
+        """Run chunks on a background thread until stop() is called"""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._loop, name="qpu-scheduler", daemon=True)
+        self._thread.start()
+        logger.info("Scheduler started")
+
+    def _loop(self):
+        while True:
+            with self._condition:
+                if not self._running:
+                    return
+            if not self.step():
+                with self._condition:
+                    if self._running:
+                        self._condition.wait(timeout=1.0)
+
+    def stop(self):
+        """Stop the background thread after the current chunk"""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        logger.info("Scheduler stopped")
@@ -0,0 +1,508 @@
+"""
+Sharding Module
+=============
+
+Splits large shot counts and parameter sweeps into shards and executes them
+on several worker processes or hosts. Workers speak a small length-prefixed
+JSON protocol over TCP; the coordinator retries failed shards on other
+workers and merges histograms in shard order so results are deterministic.
+Histograms always travel as JSON. When measurement arrays are requested,
+workers on the coordinator's host publish them to shared memory and only
+send a small descriptor; remote workers send them as base64-encoded bytes.
+"""
+
+import json
+import queue
+import base64
+import socket
+import struct
+import logging
+import threading
+import socketserver
+import multiprocessing
+import cirq
+import numpy as np
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from .qpu_interface import QPUInterface, QPUConfig
+from .shm_transport import SharedResultStore, attach_result
+
+logger = logging.getLogger(__name__)
+
+Address = Tuple[str, int]
+
+_LOCAL_HOSTS = ('127.0.0.1', 'localhost', '::1')
+
+_HEADER = struct.Struct('!I')
+
+def send_message(sock: socket.socket, message: Dict):
+    """Send one length-prefixed JSON message"""
+    payload = json.dumps(message).encode('utf-8')
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+def recv_message(sock: socket.socket) -> Optional[Dict]:
+    """Receive one length-prefixed JSON message, or None on a closed socket"""
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+    (length,) = _HEADER.unpack(header)
+    payload = _recv_exact(sock, length)
+    if payload is None:
+        raise ConnectionError("Connection closed mid-message")
+    return json.loads(payload.decode('utf-8'))
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    """Read exactly size bytes from a socket"""
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+def _encode_array(array: np.ndarray) -> Dict:
+    """Pack an array into a JSON-safe dict"""
+    array = np.ascontiguousarray(array)
+    return {
+        'dtype': array.dtype.str,
+        'shape': list(array.shape),
+        'data': base64.b64encode(array.tobytes()).decode('ascii')
+    }
+
+def _decode_array(packed: Dict) -> np.ndarray:
+    """Unpack an array packed by _encode_array"""
+    data = base64.b64decode(packed['data'])
+    return np.frombuffer(data, dtype=np.dtype(packed['dtype'])).reshape(packed['shape'])
+
+def merge_counts(shard_counts: List[Dict[str, Dict[int, int]]]) -> Dict[str, Dict[int, int]]:
+    """
+    Merge per-key histograms in the given order
+
+    Args:
+        shard_counts: List of {measurement key: {outcome: count}} dicts
+
+    Returns:
+        Merged histograms with keys and outcomes in sorted order
+    """
+    merged: Dict[str, Counter] = {}
+    for counts in shard_counts:
+        for key, histogram in counts.items():
+            merged.setdefault(key, Counter()).update(histogram)
+    return {
+        key: Counter(dict(sorted(merged[key].items())))
+        for key in sorted(merged)
+    }
+
+class _ShardHandler(socketserver.StreamRequestHandler):
+    """Serves shard requests on one coordinator connection"""
+
+    def handle(self):
+        worker: 'ShardWorker' = self.server.worker
+        while True:
+            try:
+                message = recv_message(self.request)
+            except (ConnectionError, OSError):
+                return
+            if message is None:
+                return
+
+            op = message.get('op')
+            if op == 'ping':
+                send_message(self.request, {'ok': True})
+            elif op == 'run':
+                send_message(self.request, worker.run_shard(message))
+            elif op == 'release':
+                worker.release(message.get('ids', []))
+                send_message(self.request, {'ok': True})
+            elif op == 'shutdown':
+                send_message(self.request, {'ok': True})
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+            else:
+                send_message(self.request, {'ok': False, 'retryable': False,
+                                            'error': f"Unknown operation: {op}"})
+
+class _ShardServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+class ShardWorker:
+    """Executes shards received from a coordinator"""
+
+    def __init__(self,
+                 host: str = '127.0.0.1',
+                 port: int = 0,
+                 qpu_interface: Optional[QPUInterface] = None,
+                 result_max_age_s: float = 3600.0):
+        """
+        Initialize the worker
+
+        Args:
+            host: Interface to listen on
+            port: TCP port to listen on (0 picks a free port)
+            qpu_interface: QPU interface instance. If None, creates a new one.
+            result_max_age_s: Age after which unreleased shared memory
+                results are reclaimed
+        """
+        self.qpu = qpu_interface or QPUInterface()
+        self.results = SharedResultStore(prefix='qpushard')
+        self.result_max_age_s = result_max_age_s
+        self._lock = threading.Lock()
+        self.server = _ShardServer((host, port), _ShardHandler)
+        self.server.worker = self
+        self.address: Address = self.server.server_address[:2]
+        logger.info(f"Shard worker listening on {self.address[0]}:{self.address[1]}")
+
+    def run_shard(self, message: Dict) -> Dict:
+        """
+        Execute one shard
+
+        Args:
+            message: Request with 'circuit' (Cirq JSON) and 'shots'. Optional
+                'measurements' asks for the measurement arrays, 'transport'
+                of 'shm' returns them through shared memory, and 'release'
+                lists shared memory results the coordinator is done with.
+
+        Returns:
+            Response dict with serialized counts (plus measurements or a
+            shared memory result descriptor), or an error
+        """
+        self.release(message.get('release', []))
+        try:
+            circuit = cirq.read_json(json_text=message['circuit'])
+            # The QPU interface tracks a single status, so run shards one at a time
+            with self._lock:
+                results = self.qpu.execute_circuit(circuit, shots=message['shots'])
+            response = {
+                'ok': True,
+                'shots': results['shots'],
+                'counts': {
+                    key: {str(outcome): int(n) for outcome, n in histogram.items()}
+                    for key, histogram in results['counts'].items()
+                }
+            }
+            if message.get('measurements'):
+                if message.get('transport') == 'shm':
+                    # Results of coordinators that went away are never released
+                    self.results.reap(self.result_max_age_s)
+                    response['result'] = self.results.publish({
+                        'measurements': results['measurements'],
+                        'shots': results['shots']
+                    })
+                else:
+                    response['measurements'] = {
+                        key: _encode_array(values)
+                        for key, values in results['measurements'].items()
+                    }
+            return response
+        except ValueError as e:
+            # Invalid or over-budget jobs fail the same way everywhere
+            logger.error(f"Shard rejected: {str(e)}")
+            return {'ok': False, 'retryable': False, 'error': str(e)}
+        except Exception as e:
+            logger.error(f"Shard failed: {str(e)}")
+            return {'ok': False, 'retryable': True, 'error': str(e)}
+
+    def release(self, result_ids: List[str]):
+        """Free shared memory results the coordinator has attached"""
+        for result_id in result_ids:
+            self.results.release(result_id)
+
+    def serve_forever(self):
+        """Serve shard requests until shut down"""
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            self.results.close()
+
+def _local_worker_main(config: Optional[QPUConfig], address_queue):
+    """Entry point of a local worker process"""
+    worker = ShardWorker(qpu_interface=QPUInterface(config))
+    address_queue.put(worker.address)
+    worker.serve_forever()
+
+class LocalWorkerCluster:
+    """Runs shard workers as local processes standing in for remote nodes"""
+
+    def __init__(self, num_workers: int = 2, config: Optional[QPUConfig] = None,
+                 start_timeout_s: float = 60.0):
+        """
+        Start the local workers
+
+        Args:
+            num_workers: Number of worker processes
+            config: QPUConfig for each worker's QPU interface
+            start_timeout_s: How long to wait for each worker to come up
+        """
+        address_queue = multiprocessing.Queue()
+        self.processes = []
+        for _ in range(num_workers):
+            process = multiprocessing.Process(
+                target=_local_worker_main, args=(config, address_queue), daemon=True
+            )
+            process.start()
+            self.processes.append(process)
+        self.addresses: List[Address] = [
+            tuple(address_queue.get(timeout=start_timeout_s)) for _ in range(num_workers)
+        ]
+        logger.info(f"Started {num_workers} local shard workers")
+
+    def kill(self, index: int):
+        """Terminate one worker, e.g. to exercise shard retries"""
+        self.processes[index].terminate()
+        self.processes[index].join()
+
+    def stop(self):
+        """Terminate all workers"""
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+
+    def __enter__(self) -> 'LocalWorkerCluster':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+class ShardError(RuntimeError):
+    """Raised when a shard cannot be completed on any worker"""
+
+@dataclass
+class _Shard:
+    """One unit of work sent to a worker"""
+    point: int
+    index: int
+    circuit_json: str
+    shots: int
+    measurements: bool = False
+    attempts: int = 0
+
+class ShardCoordinator:
+    """Distributes shots and sweep points across shard workers"""
+
+    def __init__(self,
+                 workers: List[Address],
+                 shard_shots: int = 100000,
+                 max_retries: int = 3,
+                 timeout_s: float = 600.0,
+                 shared_memory: bool = True):
+        """
+        Initialize the coordinator
+
+        Args:
+            workers: (host, port) addresses of the shard workers
+            shard_shots: Maximum number of shots per shard
+            max_retries: Times a failed shard is retried before giving up
+            timeout_s: Socket timeout for a single shard
+            shared_memory: Receive measurement arrays from workers on this
+                host through shared memory instead of JSON
+        """
+        if not workers:
+            raise ValueError("At least one shard worker is required")
+        self.workers = list(workers)
+        self.shard_shots = shard_shots
+        self.max_retries = max_retries
+        self.timeout_s = timeout_s
+        self.shared_memory = shared_memory
+
+    def run_shots(self, circuit: cirq.Circuit, shots: int, measurements: bool = False) -> Dict:
+        """
+        Execute a circuit with its shots split across the workers
+
+        Args:
+            circuit: The quantum circuit to execute
+            shots: Total number of repetitions
+            measurements: Also return the per-shot measurement arrays
+
+        Returns:
+            Dict containing merged counts
+        """
+        return self.run_sweep(circuit, [None], shots, measurements)[0]
+
+    def run_sweep(self,
+                  circuit: cirq.Circuit,
+                  resolvers: List[Optional[Dict[str, float]]],
+                  shots: int = 1000,
+                  measurements: bool = False) -> List[Dict]:
+        """
+        Execute a parameterized circuit at each sweep point across the workers
+
+        Args:
+            circuit: Circuit, possibly containing sympy symbols
+            resolvers: Parameter values for each sweep point
+            shots: Repetitions per sweep point
+            measurements: Also return the per-shot measurement arrays,
+                concatenated in shard order
+
+        Returns:
+            List of result dicts in sweep order
+        """
+        try:
+            shards = []
+            for point, resolver in enumerate(resolvers):
+                resolved = cirq.resolve_parameters(circuit, cirq.ParamResolver(resolver or {}))
+                circuit_json = cirq.to_json(resolved)
+                for index, start in enumerate(range(0, shots, self.shard_shots)):
+                    shards.append(_Shard(point, index, circuit_json,
+                                         min(self.shard_shots, shots - start), measurements))
+
+            completed = self._execute(shards)
+
+            results = []
+            for point in range(len(resolvers)):
+                point_shards = sorted((s for s in completed if s[0] == point), key=lambda s: s[1])
+                result = {
+                    'counts': merge_counts([counts for _, _, counts, _, _ in point_shards]),
+                    'shots': sum(n for _, _, _, n, _ in point_shards),
+                    'shards': len(point_shards)
+                }
+                if measurements:
+                    # The only copy: shard arrays (possibly shared memory
+                    # views) are concatenated straight into the result
+                    keys = point_shards[0][4].keys() if point_shards else []
+                    result['measurements'] = {
+                        key: np.concatenate([arrays[key] for _, _, _, _, arrays in point_shards])
+                        for key in keys
+                    }
+                results.append(result)
+
+            logger.info(f"Sharded execution completed: {len(shards)} shards "
+                        f"over {len(self.workers)} workers")
+            return results
+
+        except Exception as e:
+            logger.error(f"Error in sharded execution: {str(e)}")
+            raise
+
+    def _execute(self, shards: List[_Shard]) -> List[Tuple[int, int, Dict, int, Dict]]:
+        """Run shards on the worker pool, retrying failures"""
+        pending: 'queue.Queue[_Shard]' = queue.Queue()
+        for shard in shards:
+            pending.put(shard)
+
+        completed: List[Tuple[int, int, Dict, int, Dict]] = []
+        errors: List[str] = []
+        lock = threading.Lock()
+        done = threading.Event()
+        remaining = [len(shards)]
+
+        def _finish():
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                done.set()
+
+        def _fail(shard: _Shard, error: str, retryable: bool) -> bool:
+            """Requeue a failed shard; return False once it is abandoned"""
+            shard.attempts += 1
+            with lock:
+                if retryable and shard.attempts <= self.max_retries:
+                    logger.warning(f"Retrying shard {shard.point}/{shard.index}: {error}")
+                    pending.put(shard)
+                    return True
+                errors.append(f"shard {shard.point}/{shard.index}: {error}")
+                done.set()
+                return False
+
+        def _serve(address: Address):
+            sock = None
+            use_shm = self.shared_memory and address[0] in _LOCAL_HOSTS
+            # Attached shared memory results, released with the next request
+            attached: List[str] = []
+            while not done.is_set():
+                try:
+                    shard = pending.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                try:
+                    if sock is None:
+                        sock = socket.create_connection(address, timeout=self.timeout_s)
+                    request = {'op': 'run', 'circuit': shard.circuit_json, 'shots': shard.shots,
+                               'release': attached}
+                    if shard.measurements:
+                        request['measurements'] = True
+                        if use_shm:
+                            request['transport'] = 'shm'
+                    send_message(sock, request)
+                    attached = []
+                    response = recv_message(sock)
+                    if response is None:
+                        raise ConnectionError("Worker closed the connection")
+                except OSError as e:
+                    # Hand the shard to another worker and retire this one
+                    _fail(shard, f"{address[0]}:{address[1]} unreachable ({e})", True)
+                    if sock is not None:
+                        sock.close()
+                    with lock:
+                        live_workers[0] -= 1
+                        if live_workers[0] == 0:
+                            errors.append("no shard workers left")
+                            done.set()
+                    return
+
+                if not response.get('ok'):
+                    _fail(shard, response.get('error', 'unknown error'),
+                          response.get('retryable', True))
+                    continue
+
+                counts = {
+                    key: {int(outcome): n for outcome, n in histogram.items()}
+                    for key, histogram in response['counts'].items()
+                }
+                arrays = {
+                    key: _decode_array(packed)
+                    for key, packed in response.get('measurements', {}).items()
+                }
+                if 'result' in response:
+                    attached.append(response['result']['id'])
+                    try:
+                        arrays = self._attach_measurements(response['result'])
+                    except FileNotFoundError as e:
+                        # Not actually sharing memory with the worker; fall back to JSON
+                        logger.warning(f"Shared memory unavailable for "
+                                       f"{address[0]}:{address[1]} ({e})")
+                        use_shm = False
+                        _fail(shard, "shared memory result unavailable", True)
+                        continue
+                with lock:
+                    completed.append((shard.point, shard.index, counts, response['shots'], arrays))
+                    _finish()
+
+            if sock is not None:
+                if attached:
+                    try:
+                        send_message(sock, {'op': 'release', 'ids': attached})
+                        recv_message(sock)
+                    except OSError:
+                        # The worker reaps unreleased results itself
+                        pass
+                sock.close()
+
+        live_workers = [len(self.workers)]
+        threads = [threading.Thread(target=_serve, args=(address,), daemon=True)
+                   for address in self.workers]
+        if not shards:
+            done.set()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            raise ShardError("; ".join(errors))
+        return completed
+
+    @staticmethod
+    def _attach_measurements(descriptor: Dict) -> Dict[str, np.ndarray]:
+        """
+        Map the measurement arrays of a worker's shared memory result
+
+        The arrays keep the mapping alive on their own, so they stay valid
+        after the worker releases the segment.
+        """
+        with attach_result(descriptor) as view:
+            return dict(view.measurements)
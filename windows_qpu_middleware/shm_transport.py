@@ -0,0 +1,288 @@
+"""
+Shared Memory Transport Module
+============================
+
+Moves execution results between processes without pickling them. The
+producer copies measurement and histogram arrays into a shared memory
+segment once and hands clients a small, picklable descriptor; clients map
+the arrays as read-only NumPy views. The producer owns every segment and
+tracks its lifetime so leaked segments can be detected and reclaimed. A
+client mapping stays valid for as long as any of its arrays is alive.
+"""
+
+import os
+import sys
+import mmap
+import time
+import uuid
+import logging
+import threading
+import numpy as np
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_ALIGNMENT = 64
+
+_POSIX_SHM_DIR = '/dev/shm'
+
+def _map_segment(name: str, size: int) -> Optional[mmap.mmap]:
+    """
+    Map an existing segment read-only without taking ownership of it
+
+    Arrays built on the returned mmap hold a buffer export on it, so it
+    cannot be unmapped while any of them is alive. Returns None on platforms
+    where the segment can only be reached through SharedMemory.
+    """
+    if sys.platform == 'win32':
+        # Opening through SharedMemory fails if the segment is gone; the named
+        # mapping opened next then refers to the same memory
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            return mmap.mmap(-1, size, tagname=name, access=mmap.ACCESS_READ)
+        finally:
+            shm.close()
+    if os.path.isdir(_POSIX_SHM_DIR):
+        # Mapping the file directly keeps the resource tracker out of it
+        fd = os.open(os.path.join(_POSIX_SHM_DIR, name), os.O_RDONLY)
+        try:
+            return mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+    return None
+
+def _open_segment(name: str) -> shared_memory.SharedMemory:
+    """Attach through SharedMemory where the segment cannot be mapped directly"""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    # Older versions register every attach with the resource tracker, which
+    # would unlink the producer's segment when this process exits
+    from multiprocessing import resource_tracker
+    resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+class SharedResultStore:
+    """Producer side: publishes results into shared memory segments"""
+
+    def __init__(self, prefix: str = 'qpu'):
+        """
+        Initialize the store
+
+        Args:
+            prefix: Prefix for segment names
+        """
+        self.prefix = prefix
+        self.published = 0
+        self._segments: Dict[str, Tuple[shared_memory.SharedMemory, float]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, results: Dict) -> Dict:
+        """
+        Copy execution results into a new shared memory segment
+
+        Args:
+            results: Result dict from QPUInterface.execute_circuit
+
+        Returns:
+            Descriptor dict to send to clients
+        """
+        arrays: Dict[str, np.ndarray] = {}
+        for key, values in results.get('measurements', {}).items():
+            arrays[f"measurements/{key}"] = np.ascontiguousarray(values)
+        for key, histogram in results.get('counts', {}).items():
+            outcomes = sorted(histogram)
+            arrays[f"counts/{key}/outcomes"] = np.array(outcomes, dtype=np.int64)
+            arrays[f"counts/{key}/counts"] = np.array([histogram[o] for o in outcomes], dtype=np.int64)
+
+        layout = {}
+        offset = 0
+        for name, array in arrays.items():
+            layout[name] = {'offset': offset, 'shape': list(array.shape), 'dtype': array.dtype.str}
+            offset += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+
+        result_id = uuid.uuid4().hex
+        shm = shared_memory.SharedMemory(
+            name=f"{self.prefix}_{result_id[:16]}", create=True, size=max(offset, 1)
+        )
+        try:
+            for name, array in arrays.items():
+                spec = layout[name]
+                target = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf, offset=spec['offset'])
+                target[...] = array
+                del target
+        except Exception:
+            shm.close()
+            shm.unlink()
+            raise
+
+        with self._lock:
+            self._segments[result_id] = (shm, time.monotonic())
+            self.published += 1
+
+        logger.debug(f"Published result {result_id} ({offset} bytes) to {shm.name}")
+        return {
+            'id': result_id,
+            'segment': shm.name,
+            'size': shm.size,
+            'shots': results.get('shots'),
+            'arrays': layout
+        }
+
+    def release(self, result_id: str) -> bool:
+        """
+        Free a published result once every client is done with it
+
+        Args:
+            result_id: Descriptor id returned by publish()
+
+        Returns:
+            bool: True if the segment existed and was freed
+        """
+        with self._lock:
+            entry = self._segments.pop(result_id, None)
+        if entry is None:
+            return False
+        shm, _ = entry
+        shm.close()
+        shm.unlink()
+        return True
+
+    def leaked(self, max_age_s: float) -> List[str]:
+        """Return ids of results still published after max_age_s seconds"""
+        now = time.monotonic()
+        with self._lock:
+            return [rid for rid, (_, created) in self._segments.items() if now - created > max_age_s]
+
+    def reap(self, max_age_s: float) -> int:
+        """
+        Free results that were never released
+
+        Args:
+            max_age_s: Age after which an unreleased result counts as leaked
+
+        Returns:
+            Number of segments freed
+        """
+        leaked = self.leaked(max_age_s)
+        for result_id in leaked:
+            logger.warning(f"Reclaiming leaked shared memory result {result_id}")
+            self.release(result_id)
+        return len(leaked)
+
+    @property
+    def active(self) -> int:
+        """Number of published, unreleased results"""
+        with self._lock:
+            return len(self._segments)
+
+    def close(self):
+        """Free every segment owned by this store"""
+        with self._lock:
+            result_ids = list(self._segments)
+        if result_ids:
+            logger.warning(f"Closing store with {len(result_ids)} unreleased results")
+        for result_id in result_ids:
+            self.release(result_id)
+
+    def __enter__(self) -> 'SharedResultStore':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class SharedResultView:
+    """
+    Client side: maps a published result as read-only NumPy arrays
+
+    The arrays reference the mapping directly, so they stay valid after
+    close() and the memory is unmapped once the last of them is freed. Where
+    the platform offers no direct mapping the arrays are private copies.
+    """
+
+    def __init__(self, descriptor: Dict):
+        """
+        Attach to a published result
+
+        Args:
+            descriptor: Descriptor returned by SharedResultStore.publish()
+        """
+        self.id = descriptor['id']
+        self.shots = descriptor.get('shots')
+        self.measurements: Dict[str, np.ndarray] = {}
+        self.counts: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+        self._mapping = _map_segment(descriptor['segment'], descriptor.get('size', 0))
+        self.zero_copy = self._mapping is not None
+        shm = None if self.zero_copy else _open_segment(descriptor['segment'])
+
+        outcomes: Dict[str, np.ndarray] = {}
+        totals: Dict[str, np.ndarray] = {}
+        try:
+            for name, spec in descriptor['arrays'].items():
+                self._add_array(name, spec, shm, outcomes, totals)
+        finally:
+            if shm is not None:
+                shm.close()
+        for key in outcomes:
+            self.counts[key] = (outcomes[key], totals[key])
+
+    def _add_array(self, name: str, spec: Dict, shm: Optional[shared_memory.SharedMemory],
+                   outcomes: Dict[str, np.ndarray], totals: Dict[str, np.ndarray]):
+        """Build one array of the result from the segment layout"""
+        shape = tuple(spec['shape'])
+        dtype = np.dtype(spec['dtype'])
+        count = int(np.prod(shape, dtype=np.int64))
+        if count == 0:
+            array = np.empty(shape, dtype=dtype)
+        elif self._mapping is not None:
+            # frombuffer keeps an export on the mmap for the array's lifetime
+            array = np.frombuffer(self._mapping, dtype=dtype, count=count,
+                                  offset=spec['offset']).reshape(shape)
+        else:
+            array = np.frombuffer(shm.buf, dtype=dtype, count=count,
+                                  offset=spec['offset']).reshape(shape).copy()
+        array.flags.writeable = False
+
+        kind, key = name.split('/', 1)
+        if kind == 'measurements':
+            self.measurements[key] = array
+        elif key.endswith('/outcomes'):
+            outcomes[key[:-len('/outcomes')]] = array
+        else:
+            totals[key[:-len('/counts')]] = array
+
+    def histogram(self, key: str) -> Dict[int, int]:
+        """Return the histogram for a key as a (copied) dict"""
+        outcomes, totals = self.counts[key]
+        return dict(zip(outcomes.tolist(), totals.tolist()))
+
+    def close(self):
+        """
+        Drop the view's references to the segment
+
+        Arrays the caller still holds keep the mapping alive; it is unmapped
+        when the last of them is freed.
+        """
+        self.measurements.clear()
+        self.counts.clear()
+        if self._mapping is None:
+            return
+        try:
+            self._mapping.close()
+        except BufferError:
+            # Arrays still export the mapping; dropping our reference leaves
+            # the unmap to the mmap's deallocation
+            pass
+        self._mapping = None
+
+    def __enter__(self) -> 'SharedResultView':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def attach_result(descriptor: Dict) -> SharedResultView:
+    """Map a published result into this process"""
+    return SharedResultView(descriptor)
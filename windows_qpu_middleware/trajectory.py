@@ -0,0 +1,272 @@
+"""
+Trajectory Module
+===============
+
+Vectorized Monte Carlo trajectory simulation of noisy circuits. A batch of
+trajectory statevectors is held as one array with a leading batch axis, so
+every gate and every stochastic channel is applied to all trajectories in a
+single NumPy operation. Depolarizing, amplitude-damping and readout errors
+are derived from a calibration snapshot.
+"""
+
+import logging
+import cirq
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+from .calibration import CalibrationSnapshot
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_BYTES = 256 * 2 ** 20
+
+def trajectory_batch_size(num_qubits: int,
+                          itemsize: int,
+                          max_batch_bytes: int = DEFAULT_BATCH_BYTES,
+                          max_batch: int = 1024) -> int:
+    """Number of trajectories that fit in max_batch_bytes (state plus scratch copy)"""
+    per_trajectory = 2 * (2 ** num_qubits) * itemsize
+    return int(max(1, min(max_batch, max_batch_bytes // per_trajectory)))
+
+class BatchedTrajectorySimulator:
+    """Noisy sampler that evolves a batch of trajectories in lockstep"""
+
+    def __init__(self,
+                 calibration: CalibrationSnapshot,
+                 gate_time_us: float = 0.05,
+                 dtype: type = np.complex64,
+                 max_batch_bytes: int = DEFAULT_BATCH_BYTES,
+                 seed: Optional[int] = None):
+        """
+        Initialize the simulator
+
+        Args:
+            calibration: Snapshot providing gate/measurement fidelities and T1
+            gate_time_us: Duration of one gate, used for amplitude damping
+            dtype: Complex dtype of the trajectory states
+            max_batch_bytes: Memory bound for one batch of trajectories
+            seed: Seed for the stochastic channels and sampling
+        """
+        self.calibration = calibration
+        self.gate_time_us = gate_time_us
+        self.dtype = np.dtype(dtype)
+        self.max_batch_bytes = max_batch_bytes
+        self._rng = np.random.default_rng(seed)
+
+        self.depolarizing = 1.0 - calibration.gate_fidelity
+        self.damping = 1.0 - np.exp(-gate_time_us / calibration.coherence_time_us)
+        self.readout_error = 1.0 - calibration.measurement_fidelity
+
+    def with_calibration(self, calibration: CalibrationSnapshot) -> 'BatchedTrajectorySimulator':
+        """Return a simulator using another calibration snapshot"""
+        simulator = BatchedTrajectorySimulator(
+            calibration, self.gate_time_us, self.dtype, self.max_batch_bytes
+        )
+        simulator._rng = self._rng
+        return simulator
+
+    def run(self,
+            program: cirq.Circuit,
+            param_resolver: cirq.ParamResolverOrSimilarType = None,
+            repetitions: int = 1) -> cirq.Result:
+        """
+        Sample a circuit under calibration-driven noise
+
+        Args:
+            program: Circuit with terminal measurements
+            param_resolver: Parameters for the circuit
+            repetitions: Number of trajectories (one sample each)
+
+        Returns:
+            cirq.Result with the sampled measurements
+        """
+        resolver = cirq.ParamResolver(param_resolver)
+        circuit = cirq.resolve_parameters(program, resolver)
+        if not circuit.are_all_measurements_terminal():
+            raise ValueError("Trajectory simulation requires terminal measurements")
+
+        qubits = list(cirq.QubitOrder.DEFAULT.order_for(circuit.all_qubits()))
+        index = {q: i for i, q in enumerate(qubits)}
+        gates = [
+            (cirq.unitary(op), [index[q] for q in op.qubits])
+            for op in circuit.all_operations() if not cirq.is_measurement(op)
+        ]
+        measurements = [op for op in circuit.all_operations() if cirq.is_measurement(op)]
+        measured = [index[q] for op in measurements for q in op.qubits]
+
+        batch = trajectory_batch_size(len(qubits), self.dtype.itemsize, self.max_batch_bytes)
+        samples = []
+        remaining, chunk = repetitions, batch
+        while remaining > 0:
+            size = min(chunk, remaining)
+            states, counts = self._evolve(len(qubits), gates, size)
+            samples.append(self._sample(states, counts, len(qubits), measured))
+            remaining -= size
+            # The batch bound applies to distinct states, not trajectories;
+            # size the next chunk from the distinct states this one needed
+            chunk = max(batch, batch * size // len(counts))
+        bits = np.concatenate(samples) if samples else np.zeros((0, len(measured)), dtype=np.int8)
+
+        results = {}
+        offset = 0
+        for op in measurements:
+            width = len(op.qubits)
+            values = bits[:, offset:offset + width]
+            invert_mask = op.gate.full_invert_mask()
+            if any(invert_mask):
+                values = values ^ np.array(invert_mask, dtype=np.int8)
+            results[cirq.measurement_key_name(op)] = values
+            offset += width
+        return cirq.ResultDict(params=resolver, measurements=results)
+
+    def run_batch(self,
+                  programs: Sequence[cirq.Circuit],
+                  params_list: Optional[Sequence[cirq.Sweepable]] = None,
+                  repetitions=1) -> List[List[cirq.Result]]:
+        """Run several circuits"""
+        params_list = params_list or [None] * len(programs)
+        if isinstance(repetitions, int):
+            repetitions = [repetitions] * len(programs)
+        return [
+            [self.run(program, resolver, repetitions=n) for resolver in cirq.to_resolvers(params)]
+            for program, params, n in zip(programs, params_list, repetitions)
+        ]
+
+    def _evolve(self, num_qubits: int, gates: List, size: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Evolve a batch of trajectories through the gates and noise channels
+
+        Trajectories that have seen the same error events share one state:
+        the batch holds distinct states plus the number of trajectories in
+        each, and a group is only split when some of its trajectories draw a
+        Pauli error or a jump. The error-free path is simulated once.
+
+        Returns:
+            Tuple of (distinct states, trajectory count per state)
+        """
+        states = np.zeros((1, 2 ** num_qubits), dtype=self.dtype)
+        states[0, 0] = 1
+        counts = np.array([size], dtype=np.int64)
+        for matrix, axes in gates:
+            states = self._apply(states, matrix, axes, num_qubits)
+            for axis in axes:
+                if self.depolarizing > 0:
+                    states, counts = self._depolarize(states, counts, axis, num_qubits)
+                if self.damping > 0:
+                    states, counts = self._amplitude_damp(states, counts, axis, num_qubits)
+        return states, counts
+
+    @staticmethod
+    def _apply(states: np.ndarray, matrix: np.ndarray, axes: List[int], num_qubits: int) -> np.ndarray:
+        """
+        Apply a k-qubit matrix to the same qubits of every trajectory
+
+        States are kept as contiguous (batch, 2**n) rows with qubit 0 as the
+        most significant bit, so a gate on adjacent qubits is one matmul over
+        a reshaped view. When few amplitudes follow the targets, the matrix
+        is widened with an identity so the matmul stays a single wide GEMM.
+        """
+        k = len(axes)
+        order = np.argsort(axes)
+        axes = [axes[i] for i in order]
+        tensor = matrix.reshape((2,) * (2 * k)).transpose(list(order) + [k + i for i in order])
+        matrix = tensor.reshape(2 ** k, 2 ** k).astype(states.dtype, copy=False)
+
+        if axes[-1] - axes[0] == k - 1:
+            inner = 2 ** (num_qubits - axes[-1] - 1)
+            if matrix.shape[0] * inner <= 64:
+                widened = np.kron(matrix, np.eye(inner, dtype=states.dtype))
+                return (states.reshape(-1, widened.shape[0]) @ widened.T).reshape(states.shape)
+            return np.matmul(matrix, states.reshape(-1, 2 ** k, inner)).reshape(states.shape)
+
+        # Non-adjacent targets: contract over the tensor axes instead
+        targets = [a + 1 for a in axes]
+        result = np.tensordot(tensor.astype(states.dtype, copy=False),
+                              states.reshape((-1,) + (2,) * num_qubits),
+                              axes=(list(range(k, 2 * k)), targets))
+        return np.ascontiguousarray(np.moveaxis(result, list(range(k)), targets)).reshape(states.shape)
+
+    def _depolarize(self, states: np.ndarray, counts: np.ndarray,
+                    axis: int, num_qubits: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Apply a random Pauli with total probability p to each trajectory"""
+        third = self.depolarizing / 3
+        draws = self._rng.multinomial(counts, [1 - self.depolarizing, third, third, third])
+        if not draws[:, 1:].any():
+            return states, counts
+
+        # Each group keeps its slot for its first non-empty branch (no error,
+        # X, Y, Z); later branches are appended as copies. Copies are taken
+        # before any slot is overwritten.
+        first = np.argmax(draws > 0, axis=1)
+        paulis = [cirq.unitary(pauli) for pauli in (cirq.X, cirq.Y, cirq.Z)]
+        branches, branch_counts = [states], [draws[np.arange(len(first)), first]]
+        for i, pauli in enumerate(paulis, start=1):
+            appended = np.nonzero((draws[:, i] > 0) & (first != i))[0]
+            if appended.size:
+                branches.append(self._apply(states[appended], pauli, [axis], num_qubits))
+                branch_counts.append(draws[appended, i])
+        for i, pauli in enumerate(paulis, start=1):
+            moved = np.nonzero(first == i)[0]
+            if moved.size:
+                states[moved] = self._apply(states[moved], pauli, [axis], num_qubits)
+
+        if len(branches) == 1:
+            return states, branch_counts[0]
+        return np.concatenate(branches), np.concatenate(branch_counts)
+
+    def _amplitude_damp(self, states: np.ndarray, counts: np.ndarray,
+                        axis: int, num_qubits: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Apply amplitude damping as a per-trajectory quantum jump"""
+        gamma = self.damping
+        inner = 2 ** (num_qubits - axis - 1)
+        view = states.reshape(states.shape[0], -1, 2, inner)
+
+        # |1> population of each group, read straight from the real and
+        # imaginary parts of the contiguous rows without a copy
+        components = states.view(states.real.dtype).reshape(states.shape[0], -1, 2, 2 * inner)[:, :, 1, :]
+        excited = np.einsum('gab,gab->g', components, components)
+        jumps = self._rng.binomial(counts, np.minimum(gamma * excited, 1.0))
+
+        # Jump: the |1> component decays to |0>. All jumped trajectories of a
+        # group end in the same state, so they form one new group.
+        jumped = np.nonzero(jumps)[0]
+        if jumped.size:
+            decayed = np.zeros((jumped.size,) + view.shape[1:], dtype=states.dtype)
+            decayed[:, :, 0, :] = view[jumped, :, 1, :] / np.sqrt(excited[jumped])[:, None, None]
+
+        # No jump: |1> is attenuated and the state renormalized, in place
+        # with a per-group factor broadcast over the batch
+        norm = 1.0 / np.sqrt(np.maximum(1 - gamma * excited, np.finfo(excited.dtype).tiny))
+        view[:, :, 0, :] *= norm[:, None, None]
+        view[:, :, 1, :] *= (np.sqrt(1 - gamma) * norm)[:, None, None]
+
+        if not jumped.size:
+            return states, counts
+        decayed = decayed.reshape(jumped.size, -1)
+        whole = jumps[jumped] == counts[jumped]
+        states[jumped[whole]] = decayed[whole]
+        counts = counts.copy()
+        split = jumped[~whole]
+        counts[split] -= jumps[split]
+        if not split.size:
+            return states, counts
+        return (np.concatenate([states, decayed[~whole]]),
+                np.concatenate([counts, jumps[split]]))
+
+    def _sample(self, states: np.ndarray, counts: np.ndarray,
+                num_qubits: int, measured: List[int]) -> np.ndarray:
+        """Draw one bitstring per trajectory and apply readout errors"""
+        cumulative = np.cumsum(np.abs(states) ** 2, axis=1)
+        outcomes = np.concatenate([
+            np.searchsorted(row, self._rng.random(count) * row[-1], side='right')
+            for row, count in zip(cumulative, counts)
+        ])
+        outcomes = np.minimum(outcomes, 2 ** num_qubits - 1)
+        # Groups are drawn one after another; shuffle so shots stay i.i.d.
+        outcomes = self._rng.permutation(outcomes)
+
+        # Qubit 0 is the most significant bit of the flattened index
+        shifts = np.array([num_qubits - 1 - q for q in measured], dtype=np.int64)
+        bits = ((outcomes[:, None] >> shifts[None, :]) & 1).astype(np.int8)
+        if self.readout_error > 0 and bits.size:
+            bits ^= (self._rng.random(bits.shape) < self.readout_error).astype(np.int8)
+        return bits
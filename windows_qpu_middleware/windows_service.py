@@ -18,6 +18,7 @@ from pathlib import Path
 from typing import Optional
 from windows_qpu_middleware.qpu_interface import QPUInterface
 from windows_qpu_middleware.circuit_manager import CircuitManager
+from windows_qpu_middleware.scheduler import FairShareScheduler
 
 # Configure logging
 log_path = Path("C:/ProgramData/WindowsQPUMiddleware/logs")
@@ -45,6 +46,7 @@ class WindowsQPUService(win32serviceutil.ServiceFramework):
         self.stop_event = win32event.CreateEvent(None, 0, 0, None)
         self.qpu_interface: Optional[QPUInterface] = None
         self.circuit_manager: Optional[CircuitManager] = None
+        self.scheduler: Optional[FairShareScheduler] = None
         socket.setdefaulttimeout(60)
         self.is_alive = True
         
@@ -54,6 +56,10 @@ class WindowsQPUService(win32serviceutil.ServiceFramework):
         """
         logger.info("Service stop signal received")
         self.ReportServiceStatus(win32service.SERVICE_STOP_PENDING)
+        if self.scheduler is not None:
+            self.scheduler.stop()
+        if self.qpu_interface is not None:
+            self.qpu_interface.close()
         win32event.SetEvent(self.stop_event)
         self.is_alive = False
         
@@ -73,6 +79,10 @@ class WindowsQPUService(win32serviceutil.ServiceFramework):
             self.qpu_interface = QPUInterface()
             self.circuit_manager = CircuitManager(self.qpu_interface)
             
+            # Jobs are executed chunk by chunk on the scheduler thread
+            self.scheduler = FairShareScheduler(self.qpu_interface)
+            self.scheduler.start()
+            
             # Main service loop
             while self.is_alive:
                 # Check for pending operations
@@ -106,9 +116,11 @@ class WindowsQPUService(win32serviceutil.ServiceFramework):
         """
         Process queued quantum operations
         """
-        # This would implement the actual queue processing logic
-        # For now, it's a placeholder for the queue implementation
-        pass
+        # Chunks are dispatched by the scheduler thread; report queue depth
+        pending = self.scheduler.pending()
+        if pending:
+            tenants = {job.tenant for job in pending}
+            logger.debug(f"{len(pending)} jobs pending across {len(tenants)} tenants")
 
 class QPUServiceController:
     """Controller class for managing the QPU Windows service"""